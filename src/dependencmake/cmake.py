@@ -9,6 +9,7 @@ from dependencmake.exceptions import DependenCmakeError
 CMAKE = "cmake"
 CMAKE_BUILD = "--build"
 CMAKE_BUILD_PATH = "-B"
+CMAKE_CACHE_FILE = "CMakeCache.txt"
 CMAKE_INSTALL = "--install"
 CMAKE_INSTALL_PREFIX = "-DCMAKE_INSTALL_PREFIX={}"
 CMAKE_LISTS_FILE = "CMakeLists.txt"
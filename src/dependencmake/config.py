@@ -1,4 +1,5 @@
 from distutils.util import strtobool
+from functools import lru_cache
 
 try:
     from importlib.resources import path
@@ -7,7 +8,13 @@ except ImportError:
     from importlib_resources import path  # type: ignore
 
 from path import Path
-from yaml import Loader, load
+from yaml import load
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+
+except ImportError:
+    from yaml import SafeLoader  # type: ignore
 
 from dependencmake.exceptions import DependenCmakeError
 
@@ -29,18 +36,51 @@ def create_config(directory: Path, force: bool = False):
         Path(resource).copy(destination)
 
 
+@lru_cache(maxsize=256)
+def load_config(config_path: Path, mtime_ns: int, size: int) -> dict:
+    """Parse config file.
+
+    The file is parsed with LibYAML if available, which is much faster than
+    the pure Python parser. Result is cached by modification time and size of
+    the file, so it must not be modified.
+    """
+    return load(config_path.read_text(), Loader=SafeLoader)
+
+
 def get_config(path: Path) -> dict:
     """Read config file."""
     config_path = path / CONFIG_NAME
     if not config_path.exists():
         raise ConfigNotFoundError(f"Unable to find a {CONFIG_NAME} file in {path}")
 
-    return load(config_path.read_text(), Loader=Loader)
+    stat = config_path.stat()
+
+    return copy_config(load_config(config_path, stat.st_mtime_ns, stat.st_size))
+
+
+def copy_config(config: dict) -> dict:
+    """Copy a config, so that the cached version is not modified.
+
+    Only lists and the mappings they contain are copied, as other values are
+    scalars. This is much faster than a deep copy. Configs that are not
+    mappings are returned as is, so that they are rejected by `check_config`.
+    """
+    if not isinstance(config, dict):
+        return config
+
+    return {
+        key: (
+            [dict(item) if isinstance(item, dict) else item for item in value]
+            if isinstance(value, list)
+            else value
+        )
+        for key, value in config.items()
+    }
 
 
 def check_config(config: dict):
     """Check if the config file is valid."""
-    if "dependencies" not in config:
+    if not isinstance(config, dict) or "dependencies" not in config:
         raise IncorrectConfigError("Key 'dependencies' missing from config")
 
 
@@ -1,20 +1,45 @@
+import errno
 import hashlib
 import sys
-from dataclasses import dataclass
-from io import StringIO
+import tarfile
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from io import BytesIO, StringIO
 from multiprocessing import cpu_count
-from shutil import ReadError, get_unpack_formats, unpack_archive
+from os import environ, rename, scandir
+from shutil import ReadError, get_unpack_formats, move, unpack_archive
 from tempfile import TemporaryDirectory
-from typing import Optional
-from urllib.error import HTTPError
-from urllib.request import urlretrieve
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from zipfile import BadZipFile, ZipFile
 
 from furl import furl
-from git import GitCommandError, Repo
 from packaging import version
 from path import Path
+from urllib3 import PoolManager
+from urllib3.exceptions import HTTPError
+from urllib3.util.retry import Retry
+
+try:
+    import libarchive
+    from libarchive.extract import (
+        EXTRACT_SECURE_NODOTDOT,
+        EXTRACT_SECURE_SYMLINKS,
+        extract_entries,
+    )
+
+except ImportError:
+    libarchive = None
 
 from dependencmake.cmake import (
+    CMAKE_CACHE_FILE,
+    CMAKE_LISTS_FILE,
     CMakeBuildError,
     CMakeConfigureError,
     CMakeInstallError,
@@ -26,11 +51,158 @@ from dependencmake.cmake import (
 )
 from dependencmake.exceptions import DependenCmakeError
 from dependencmake.filesystem import CACHE_BUILD, CACHE_FETCH
+from dependencmake.graph import (
+    CircularDependencyError,
+    compute_order,
+    get_requirements,
+    group_by_directory,
+)
 
+BUILD_STAMP = ".dependencmake_build"
+CONFIGURE_STAMP = ".dependencmake_configure"
+COMPILER_VARIABLES = ["CC", "CXX", "FC"]
+NO_CACHE_VARIABLE = "DEPENDENCMAKE_NO_CACHE"
 ARCHIVE_EXTENSIONS = [ext for format in get_unpack_formats() for ext in format[1]]
 CPU_CORES = cpu_count()
+FETCH_WORKERS = 16
+GIT_CLONE_OPTIONS = ["--filter=blob:none"]
+POOL = PoolManager(maxsize=FETCH_WORKERS, retries=Retry(total=3, backoff_factor=0.2))
+
+
+def download_and_extract(url: str, extension: str, path: Path):
+    """Download an archive and extract it in the given directory.
+
+    The type of archive is given by the extension of its file name, as the
+    URL may have a query string. Tar archives are extracted while being
+    downloaded, other archives are read in memory first, as they cannot be
+    extracted from a stream.
+    """
+    response = POOL.request("GET", url, preload_content=False)
+
+    try:
+        if response.status >= 400:
+            raise HTTPError(f"HTTP Error {response.status}: {response.reason}")
+
+        try:
+            if extension == ".zip":
+                with ZipFile(BytesIO(response.read())) as archive:
+                    archive.extractall(path)
+
+            else:
+                with tarfile.open(fileobj=response, mode="r|*") as archive:
+                    archive.extractall(path)
+
+        except (BadZipFile, tarfile.TarError) as error:
+            raise ReadError(str(error)) from error
+
+    finally:
+        # read what is left of the body, so that a clean connection is given
+        # back to the pool
+        response.drain_conn()
+        response.release_conn()
+
+
+def extract(archive_path: Path, path: Path):
+    """Extract a local archive in the given directory.
+
+    libarchive is used if it is installed, as it is faster than the standard
+    library. Errors are raised as `shutil.ReadError` in both cases.
+    """
+    if libarchive is None:
+        unpack_archive(archive_path, path)
+        return
+
+    def is_unsafe(name):
+        return name.startswith("/") or ".." in name.split("/")
+
+    def relocate(entries):
+        # entries are extracted relatively to the current directory, which
+        # cannot be changed safely when several threads are running, so they
+        # are made absolute, and entries escaping the directory are skipped
+        # like the standard library does
+        for entry in entries:
+            if is_unsafe(entry.pathname) or (entry.islnk and is_unsafe(entry.linkpath)):
+                continue
+
+            entry.pathname = str(path / entry.pathname)
+            if entry.islnk:
+                entry.linkpath = str(path / entry.linkpath)
+
+            yield entry
+
+    try:
+        with libarchive.file_reader(str(archive_path)) as archive:
+            extract_entries(
+                relocate(archive),
+                flags=EXTRACT_SECURE_NODOTDOT | EXTRACT_SECURE_SYMLINKS,
+            )
+
+    except libarchive.ArchiveError as error:
+        raise ReadError(str(error)) from error
+
+
+def rename_or_move(source_path: Path, destination_path: Path):
+    """Rename a file or a directory, or move it if on another file system."""
+    try:
+        rename(source_path, destination_path)
+
+    except OSError as error:
+        if error.errno != errno.EXDEV:
+            raise
+
+        move(source_path, destination_path)
+
+
+@lru_cache(maxsize=None)
+def hash_url(url: str) -> str:
+    """Get a hashed version of an URL.
+
+    BLAKE2 is used as it is faster than MD5, its digest is truncated to keep
+    the same length. Result is cached, as the same URL is hashed again each
+    time a dependency using it is created.
+    """
+    return hashlib.blake2b(url.encode(), digest_size=16).hexdigest()
+
+
+@lru_cache(maxsize=256)
+def parse_url(url: str) -> furl:
+    """Get a parsed version of an URL.
+
+    Result is cached and shared between dependencies using the same URL, so it
+    must not be modified.
+    """
+    return furl(url)
+
+
+@lru_cache(maxsize=2048)
+def parse_version(version_string: str) -> version.Version:
+    """Get a parsed version of a version string.
 
+    Result is cached and shared between dependencies using the same version.
+    """
+    return version.parse(version_string)
 
+
+def add_slots(cls):
+    """Recreate a dataclass with slots instead of an attributes dictionary.
+
+    `dataclass(slots=True)` is only available from Python 3.10.
+    """
+    cls_dict = dict(cls.__dict__)
+    field_names = tuple(field.name for field in fields(cls))
+    cls_dict["__slots__"] = field_names
+
+    # remove default values of fields, they would conflict with slots
+    for name in (*field_names, "__dict__", "__weakref__"):
+        cls_dict.pop(name, None)
+
+    slots_cls = type(cls)(cls.__name__, cls.__bases__, cls_dict)
+    slots_cls.__qualname__ = cls.__qualname__
+
+    return slots_cls
+
+
+@add_slots
 @dataclass
 class Dependency:
     """Dependency for the project."""
@@ -52,8 +224,11 @@ class Dependency:
     cmake_project_version: Optional[version.Version] = None
 
     def __post_init__(self):
+        # intern name, as it is compared often
+        self.name = sys.intern(self.name)
+
         # parse URL
-        self.url_parsed = furl(self.url)
+        self.url_parsed = parse_url(self.url)
 
         # set directory name
         self.directory_name = f"{self.get_slug_name()}_{self.get_hash_url()}"
@@ -64,17 +239,27 @@ class Dependency:
 
     def get_hash_url(self) -> str:
         """Get a hashed URL of the dependency."""
-        return hashlib.md5(self.url.encode()).hexdigest()
+        return hash_url(self.url)
 
     def get_extension(self) -> str:
         """Get extension in the URL."""
         return Path(self.url_parsed.path.segments[-1]).ext
 
+    def is_fetched(self) -> bool:
+        """Tell if the dependency is in the fetch cache.
+
+        The cache is only checked if the dependency is not known to be fetched
+        already.
+        """
+        if not self.fetched:
+            self.fetched = bool((CACHE_FETCH / self.directory_name).exists())
+
+        return self.fetched
+
     def refresh(self):
         """Refresh state of dependency based on cache content."""
         # get fetched status based on cache
-        if (CACHE_FETCH / self.directory_name).exists():
-            self.fetched = True
+        self.is_fetched()
 
         # get built status based on cache
         if (CACHE_BUILD / self.directory_name).exists():
@@ -159,21 +344,33 @@ class Dependency:
         self.fetched = True
 
     def fetch_git(self):
-        """Fetch a Git repository and checkout to the requested hash if necessary."""
+        """Fetch a Git repository and checkout to the requested hash if necessary.
+
+        GitPython is imported here, as it is long to import and only needed
+        for Git dependencies.
+        """
+        from git import GitCommandError, Repo
+
         path = CACHE_FETCH / self.directory_name
 
         try:
             # clone if the path doesn't exist, or pull
-            if not path.exists():
+            if not self.is_fetched():
                 path.mkdir_p()
-                repo = Repo.clone_from(self.url, path)
+                repo = Repo.clone_from(self.url, path, multi_options=GIT_CLONE_OPTIONS)
+                previous_hexsha = None
 
             elif self.git_no_update:
                 return
 
             else:
-
                 repo = Repo(path)
+                previous_hexsha = repo.head.commit.hexsha
+
+                # do not update if already at the requested commit
+                if self.git_hash and previous_hexsha.startswith(str(self.git_hash)):
+                    return
+
                 repo.head.reference = repo.heads[0]
                 repo.remote().pull()
 
@@ -181,42 +378,52 @@ class Dependency:
             if self.git_hash:
                 repo.head.reference = repo.commit(self.git_hash)
 
+            if repo.head.commit.hexsha != previous_hexsha:
+                self.remove_build_stamp()
+
         except GitCommandError as error:
             raise GitRepoFetchError(
                 f"Cannot fetch {self.name} at {self.url}: {error}"
             ) from error
 
     def fetch_archive(self):
-        """Fech an online archive and decompress it."""
+        """Fetch an online archive and decompress it."""
         path = CACHE_FETCH / self.directory_name
 
         # download if the path doesn't exist, or do nothing otherwise
-        if path.exists():
+        if self.is_fetched():
             return
 
         with TemporaryDirectory() as temp_directory:
-            archive_path = Path(temp_directory) / self.url_parsed.path.segments[-1]
+            decompress_path = Path(temp_directory) / "extract"
+            decompress_path.mkdir_p()
 
-            # download file
+            # download and decompress file
             try:
-                urlretrieve(self.url, archive_path)
+                download_and_extract(self.url, self.get_extension(), decompress_path)
 
             except HTTPError as error:
                 raise ArchiveDownloadError(
                     f"Cannot download {self.name} at {self.url}: {error}"
                 ) from error
 
-            # decompress and move to destination
-            decompress_path = self.decompress(archive_path, Path(temp_directory))
+            except ReadError as error:
+                raise ArchiveDecompressError(
+                    f"Cannot decompress archive of {self.name}: {error}"
+                ) from error
+
+            # move to destination
             self.move_decompress_path(decompress_path, path)
 
+        self.remove_build_stamp()
+
     def fetch_folder(self):
         """Fetch a local folder and copy it."""
         path = CACHE_FETCH / self.directory_name
         folder_path = Path(self.url_parsed.path)
 
         # copy if the path doesn't exist, or do nothing otherwise
-        if path.exists():
+        if self.is_fetched():
             return
 
         # check target folder exists
@@ -239,7 +446,7 @@ class Dependency:
         archive_path = Path(self.url_parsed.path)
 
         # fetch if the path doesn't exist, or do nothing otherwise
-        if path.exists():
+        if self.is_fetched():
             return
 
         # check target folder exists
@@ -253,6 +460,34 @@ class Dependency:
             decompress_path = self.decompress(archive_path, Path(temp_directory))
             self.move_decompress_path(decompress_path, path)
 
+        self.remove_build_stamp()
+
+    def copy_fetched(self, other: "Dependency"):
+        """Fetch the dependency by copying another one with the same source."""
+        path = CACHE_FETCH / self.directory_name
+
+        # copy if the path doesn't exist, or do nothing otherwise
+        if self.is_fetched():
+            return
+
+        try:
+            (CACHE_FETCH / other.directory_name).copytree(path)
+
+        except OSError as error:
+            raise FolderCopyError(
+                f"Cannot copy {self.name} from {other.name}: {error}"
+            ) from error
+
+        self.remove_build_stamp()
+
+    def remove_build_stamp(self):
+        """Remove the build stamp, so that the next build is not skipped.
+
+        The build key does not describe the content of the sources, so the
+        stamp must be removed each time new sources are fetched.
+        """
+        (CACHE_BUILD / self.directory_name / BUILD_STAMP).remove_p()
+
     def decompress(self, archive_path: Path, temp_path: Path) -> Path:
         """Decompress an archive in a temporary directory, then move it."""
         # decompress file in a special directory, as we cannot list the
@@ -261,7 +496,7 @@ class Dependency:
         decompress_path.mkdir_p()
 
         try:
-            unpack_archive(archive_path, decompress_path)
+            extract(archive_path, decompress_path)
 
         except ReadError as error:
             raise ArchiveDecompressError(
@@ -274,19 +509,21 @@ class Dependency:
         """Move the decompress directory to destination.
 
         If the decompress directory contains one directory, move this
-        directory. If it contains multiple files, move the decompress directory
-        instead.
+        directory. If it contains multiple files or a single file, move the
+        decompress directory instead.
         """
-        decompress_files_paths = decompress_path.listdir()
-        if len(decompress_files_paths) == 1:
-            to_move_path = decompress_files_paths[0]
+        with scandir(decompress_path) as iterator:
+            entries = list(iterator)
+
+        if len(entries) == 1 and entries[0].is_dir():
+            to_move_path = Path(entries[0].path)
 
         else:
             to_move_path = decompress_path
 
         # move to fetch directory
         try:
-            to_move_path.move(destination_path)
+            rename_or_move(to_move_path, destination_path)
 
         except OSError as error:
             raise ArchiveMoveError(
@@ -312,41 +549,126 @@ class Dependency:
                 f"Unable to get project data from {self.name}"
             )
 
-        self.cmake_project_name = data["name"]
+        self.cmake_project_name = sys.intern(data["name"])
         if data["version"]:
-            self.cmake_project_version = version.parse(data["version"])
+            self.cmake_project_version = parse_version(data["version"])
+
+    def is_build_cacheable(self) -> bool:
+        """Tell if a previous build of the dependency can be reused.
+
+        Local folders, local archives and Git repositories without a requested
+        hash can change between two builds, so they are always rebuilt.
+        """
+        if environ.get(NO_CACHE_VARIABLE):
+            return False
+
+        if self.url_parsed.scheme == "file":
+            return False
+
+        if self.get_extension() == ".git" and not self.git_hash:
+            return False
+
+        return True
+
+    def get_build_key(self, install_path: Path, extra_args: list = []) -> str:
+        """Get a key identifying the sources and settings of a build."""
+        items = [
+            self.url,
+            str(self.git_hash),
+            str(self.cmake_subdir or ""),
+            str(install_path),
+            *self.cmake_args.split(),
+            *extra_args,
+            *(environ.get(variable, "") for variable in COMPILER_VARIABLES),
+        ]
+
+        return hashlib.blake2b("\0".join(items).encode(), digest_size=16).hexdigest()
+
+    def is_configured(self, key: str) -> bool:
+        """Tell if the dependency is already configured with the given key.
+
+        The configuration is outdated if the CMake lists file of the dependency
+        is more recent.
+        """
+        if environ.get(NO_CACHE_VARIABLE):
+            return False
 
-    def build(self, install_path: Path, extra_args: list = []):
-        """Configure and build the dependency."""
+        build_directory = CACHE_BUILD / self.directory_name
+        stamp_path = build_directory / CONFIGURE_STAMP
+
+        if not (build_directory / CMAKE_CACHE_FILE).exists() or not stamp_path.exists():
+            return False
+
+        if stamp_path.read_text() != key:
+            return False
+
+        return (
+            stamp_path.getmtime()
+            >= (self.get_source_directory() / CMAKE_LISTS_FILE).getmtime()
+        )
+
+    def build(self, install_path: Path, extra_args: list = [], jobs: int = 0) -> bool:
+        """Configure and build the dependency.
+
+        If the dependency was already built with the same key, configure and
+        build steps are skipped. If it was only configured with the same key,
+        the configure step is skipped. The number of jobs requested by the
+        dependency takes precedence over the one passed. Tell if the
+        dependency was actually built.
+        """
         source_directory = self.get_source_directory()
+        build_directory = CACHE_BUILD / self.directory_name
+        stamp_path = build_directory / BUILD_STAMP
+        configure_stamp_path = build_directory / CONFIGURE_STAMP
+        key = self.get_build_key(install_path, extra_args)
+        cacheable = self.is_build_cacheable()
+
+        # skip if already built with the same settings
+        if cacheable and stamp_path.exists() and stamp_path.read_text() == key:
+            self.built = True
+            return False
 
         # check there is a CMakeLists.txt file in it
         check_cmake_lists_file_exists(source_directory)
 
-        # configure
-        try:
-            cmake_configure(
-                source_directory,
-                CACHE_BUILD / self.directory_name,
-                install_path,
-                [*self.cmake_args.split(), *extra_args],
-            )
+        # invalidate any previous build
+        build_directory.mkdir_p()
+        stamp_path.remove_p()
+
+        # configure if needed
+        if not self.is_configured(key):
+            configure_stamp_path.remove_p()
 
-        except CMakeConfigureError as error:
-            raise ConfigureError(f"Cannot configure {self.name}: {error}") from error
+            try:
+                cmake_configure(
+                    source_directory,
+                    build_directory,
+                    install_path,
+                    [*self.cmake_args.split(), *extra_args],
+                )
+
+            except CMakeConfigureError as error:
+                raise ConfigureError(
+                    f"Cannot configure {self.name}: {error}"
+                ) from error
+
+            configure_stamp_path.write_text(key)
 
         # build
         try:
-            cmake_build(
-                CACHE_BUILD / self.directory_name, self.jobs or (CPU_CORES * 2 + 1)
-            )
+            cmake_build(build_directory, self.jobs or jobs or get_build_jobs())
 
         except CMakeBuildError as error:
             raise BuildError(f"Cannot build {self.name}: {error}") from error
 
         # mark as built
+        if cacheable:
+            stamp_path.write_text(key)
+
         self.built = True
 
+        return True
+
     def install(self):
         """Install the dependency."""
         try:
@@ -359,6 +681,249 @@ class Dependency:
         self.installed = True
 
 
+def get_build_jobs(concurrent_builds: int = 1, busy_jobs: int = 0) -> int:
+    """Get the number of jobs for a build starting along others.
+
+    The jobs not already used by running builds are shared between the builds
+    starting at the same time.
+    """
+    return max(1, (CPU_CORES * 2 + 1 - busy_jobs) // concurrent_builds)
+
+
+def build_all(
+    dependencies: List[Dependency], install_path: Path, extra_args: list = []
+) -> Iterator[Dependency]:
+    """Build dependencies concurrently.
+
+    A dependency is built once all its subdependencies are built, and
+    dependencies sharing the same directory are built once. A previous build
+    of a dependency is not reused if one of its subdependencies was built
+    again. The jobs budget of the machine is shared between the builds running
+    at the same time, each build receiving a share of the jobs left free when
+    it starts. Each dependency is yielded as soon as it is built. Errors are
+    collected and raised once running builds are over, no new build is started
+    after an error.
+    """
+    if not dependencies:
+        return
+
+    # group dependencies by directory and get subdependencies of each group
+    groups = group_by_directory(dependencies)
+    requirements = get_requirements(dependencies)
+
+    done: Set[str] = set()
+    errors = []
+    with ThreadPoolExecutor(max_workers=min(CPU_CORES, len(groups))) as executor:
+        futures: Dict[Future, str] = {}
+        running_jobs: Dict[str, int] = {}
+
+        def submit_ready():
+            ready = [name for name in requirements if requirements[name] <= done]
+            if not ready:
+                return
+
+            jobs = get_build_jobs(len(ready), sum(running_jobs.values()))
+            for name in ready:
+                del requirements[name]
+                running_jobs[name] = jobs
+                futures[
+                    executor.submit(
+                        groups[name][0].build, install_path, extra_args, jobs=jobs
+                    )
+                ] = name
+
+        submit_ready()
+        while futures:
+            finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = futures.pop(future)
+                del running_jobs[name]
+                try:
+                    rebuilt = future.result()
+
+                except DependenCmakeError as error:
+                    errors.append(error)
+                    continue
+
+                done.add(name)
+                for dependency in groups[name]:
+                    if rebuilt and dependency.parent is not None:
+                        dependency.parent.remove_build_stamp()
+
+                    dependency.built = True
+                    yield dependency
+
+            if not errors:
+                submit_ready()
+
+    if len(errors) == 1:
+        raise errors[0]
+
+    if errors:
+        raise BuildError(
+            "Cannot build several dependencies:\n"
+            + "\n".join(str(error) for error in errors)
+        )
+
+    if requirements:
+        raise CircularDependencyError(
+            "Circular dependency detected between: "
+            + ", ".join(groups[name][0].name for name in requirements)
+        )
+
+
+def install_all(dependencies: List[Dependency]) -> Iterator[Dependency]:
+    """Install dependencies concurrently.
+
+    Dependencies are installed by groups, a dependency being installed once
+    all its subdependencies are installed, and dependencies sharing the same
+    directory are installed once. Installing is bound by disk accesses, so
+    dependencies of a group are installed by a pool of threads. Each dependency
+    is yielded as soon as it is installed. Errors are collected and raised once
+    the group is over, no new group is started after an error.
+    """
+    groups = group_by_directory(dependencies)
+
+    errors = []
+    with ThreadPoolExecutor(max_workers=CPU_CORES) as executor:
+        for layer in compute_order(dependencies):
+            futures = {
+                executor.submit(dependency.install): dependency.directory_name
+                for dependency in layer
+            }
+            for future in as_completed(futures):
+                try:
+                    future.result()
+
+                except DependenCmakeError as error:
+                    errors.append(error)
+                    continue
+
+                for dependency in groups[futures[future]]:
+                    dependency.installed = True
+                    yield dependency
+
+            if errors:
+                break
+
+    if len(errors) == 1:
+        raise errors[0]
+
+    if errors:
+        raise InstallError(
+            "Cannot install several dependencies:\n"
+            + "\n".join(str(error) for error in errors)
+        )
+
+
+def fetch_same_directory(
+    dependencies: List[Dependency], source: Optional[Dependency] = None
+):
+    """Fetch dependencies sharing the same directory.
+
+    The first dependency is fetched, or copied from the source dependency if
+    its directory does not exist yet. The other ones are fetched again only if
+    they request another Git hash.
+    """
+    first_dependency, *other_dependencies = dependencies
+    if source is not None and not first_dependency.is_fetched():
+        first_dependency.copy_fetched(source)
+
+    else:
+        first_dependency.fetch()
+
+    first_dependency.fetched = True
+
+    previous_dependency = first_dependency
+    for dependency in other_dependencies:
+        if str(dependency.git_hash) != str(previous_dependency.git_hash):
+            dependency.fetch()
+
+        dependency.fetched = True
+        previous_dependency = dependency
+
+
+def fetch_all(
+    dependencies: List[Dependency], max_workers: int = 0
+) -> Iterator[Dependency]:
+    """Fetch dependencies concurrently.
+
+    Fetching is bound by network and disk accesses, so dependencies are fetched
+    by a pool of threads, one directory per thread. A directory whose URL and
+    Git hash were already fetched in another directory is copied from it once
+    it is ready. Each dependency is yielded as soon as it is fetched. Errors
+    are collected and raised once all fetches are over.
+    """
+    if not dependencies:
+        return
+
+    # sort dependencies by host, so that same host dependencies are fetched
+    # closely
+    dependencies = sorted(
+        dependencies, key=lambda dependency: dependency.url_parsed.host or ""
+    )
+    groups = group_by_directory(dependencies)
+
+    # split directories between the ones to fetch and the ones to copy from
+    # the first directory ending up with the same source
+    sources: Dict[Tuple[str, str], str] = {}
+    fetched_groups: List[List[Dependency]] = []
+    copied_groups: Dict[str, List[List[Dependency]]] = {}
+    for directory_name, group in groups.items():
+        source = (group[0].url, str(group[0].git_hash))
+        if source in sources:
+            copied_groups.setdefault(sources[source], []).append(group)
+
+        else:
+            fetched_groups.append(group)
+
+        sources.setdefault((group[-1].url, str(group[-1].git_hash)), directory_name)
+
+    errors = []
+    with ThreadPoolExecutor(
+        max_workers=max_workers or min(FETCH_WORKERS, len(groups))
+    ) as executor:
+        futures: Dict[Future, List[Dependency]] = {
+            executor.submit(fetch_same_directory, group): group
+            for group in fetched_groups
+        }
+        while futures:
+            finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in finished:
+                group = futures.pop(future)
+                try:
+                    future.result()
+
+                except DependenCmakeError as error:
+                    errors.append(error)
+                    continue
+
+                yield from group
+
+                # copy directories sharing the same source
+                source_dependency = group[-1]
+                for copied_group in copied_groups.get(
+                    source_dependency.directory_name, []
+                ):
+                    future = executor.submit(
+                        fetch_same_directory, copied_group, source_dependency
+                    )
+                    futures[future] = copied_group
+
+    if len(errors) == 1:
+        raise errors[0]
+
+    if errors:
+        raise FetchError(
+            "Cannot fetch several dependencies:\n"
+            + "\n".join(str(error) for error in errors)
+        )
+
+
+class FetchError(DependenCmakeError):
+    pass
+
+
 class UnknownDependencyTypeError(DependenCmakeError):
     pass
 
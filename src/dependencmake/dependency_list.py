@@ -1,15 +1,16 @@
 import sys
 from dataclasses import dataclass, field
-from typing import Iterator
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from path import Path
 from tqdm import tqdm
 
 from dependencmake.cmake import check_cmake_exists
 from dependencmake.config import ConfigNotFoundError, check_config, get_config
-from dependencmake.dependency import Dependency
+from dependencmake.dependency import Dependency, build_all, fetch_all, install_all
 from dependencmake.exceptions import DependenCmakeError
-from dependencmake.filesystem import CACHE, CACHE_BUILD, CACHE_FETCH, CACHE_INSTALL
+from dependencmake.filesystem import CACHE_BUILD, CACHE_FETCH, CACHE_INSTALL
+from dependencmake.graph import CircularDependencyError
 
 
 @dataclass
@@ -18,6 +19,9 @@ class DependencyList:
 
     install_path: Path = CACHE_INSTALL
     dependencies: list = field(default_factory=list)
+    _install_path_resolved: Optional[Tuple[Path, Path]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def __post_init__(self):
         self.install_path = self.install_path or CACHE_INSTALL
@@ -33,42 +37,76 @@ class DependencyList:
         for _ in self.generate_subdependencies():
             pass
 
-    def generate_subdependencies(self) -> Iterator[Dependency]:
-        """Generate dependencies recursively.
+    def get_subdependencies(self, dependency: Dependency) -> List[Dependency]:
+        """Get subdependencies from the config file of a dependency if any.
 
-        The iterator explores file system for config files to get the
-        subdependencies. Dependencies must have been fetched beforehand.
+        The dependency must have been fetched beforehand.
         """
-        # generate the dependencies list in revers order
-        self.dependencies.reverse()
-        i = 0
-        while i != len(self.dependencies):
-            dependency = self.dependencies[i]
-            # load config file if any or move to next dependency
-            try:
-                dependency_config = get_config(CACHE_FETCH / dependency.directory_name)
-
-            except ConfigNotFoundError:
-                i += 1
-                continue
-
-            check_config(dependency_config)
-
-            # create subdependendencies from dependency config
-            subdependencies = [
-                Dependency(**kwargs, parent=dependency)
-                for kwargs in dependency_config["dependencies"]
-            ]
-            subdependencies.reverse()
-            # add supdependencies to the dependency list
-            # they will be listed before the parent dependency
-            self.dependencies[i + 1 : i + 1] = subdependencies
-            for subdependency in subdependencies:
-                yield subdependency
-
-            i += 1
-
-        self.dependencies.reverse()
+        # load config file if any
+        try:
+            dependency_config = get_config(CACHE_FETCH / dependency.directory_name)
+
+        except ConfigNotFoundError:
+            return []
+
+        check_config(dependency_config)
+
+        subdependencies = [
+            Dependency(**kwargs, parent=dependency)
+            for kwargs in dependency_config["dependencies"]
+        ]
+
+        # check a subdependency is not one of its own parents
+        for subdependency in subdependencies:
+            parent = dependency
+            while parent is not None:
+                if parent.directory_name == subdependency.directory_name:
+                    raise CircularDependencyError(
+                        f"Circular dependency detected: {subdependency.name} "
+                        f"depends on itself through {dependency.name}"
+                    )
+
+                parent = parent.parent
+
+        return subdependencies
+
+    def generate_subdependencies(self) -> Iterator[List[Dependency]]:
+        """Generate dependencies recursively, by batches of siblings.
+
+        The dependency tree is explored depth first, using config files of the
+        dependencies to get their subdependencies. Dependencies must have been
+        fetched beforehand, so a generated batch must be fetched before the
+        iterator moves on. Dependencies of a batch are independent from each
+        other and can be fetched concurrently. The list of dependencies is
+        then sorted with subdependencies before their parent.
+        """
+        sorted_dependencies = []
+        stack: List[Tuple[Dependency, Optional[Iterator[Dependency]]]] = [
+            (dependency, None) for dependency in reversed(self.dependencies)
+        ]
+        while stack:
+            dependency, children = stack[-1]
+
+            # get subdependencies on first visit
+            if children is None:
+                subdependencies = self.get_subdependencies(dependency)
+                if subdependencies:
+                    yield subdependencies
+
+                children = iter(subdependencies)
+                stack[-1] = (dependency, children)
+
+            # visit next subdependency, or add dependency once all its
+            # subdependencies are added
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                sorted_dependencies.append(dependency)
+
+            else:
+                stack.append((child, None))
+
+        self.dependencies = sorted_dependencies
 
     def describe(self, output=sys.stdout):
         """Describe dependencies as text."""
@@ -84,77 +122,100 @@ class DependencyList:
     def fetch(self, output=sys.stdout):
         """Fetch dependencies."""
         # create fetch cache
-        CACHE.mkdir_p()
-        CACHE_FETCH.mkdir_p()
+        CACHE_FETCH.makedirs_p()
 
         # fetch immediate dependencies
         output.write("Fetching dependencies...\n")
         for dependency in tqdm(
-            self.dependencies, file=output, leave=False, unit="dependency"
+            fetch_all(self.dependencies),
+            total=len(self.dependencies),
+            file=output,
+            leave=False,
+            unit="dependency",
         ):
-            dependency.fetch()
             dependency.set_cmake_project_data()
 
         # fetch subdependencies
         output.write("Fetching subdependencies if any...\n")
         with tqdm(file=output, leave=False, unit="subdependency") as progress_bar:
-            for subdependency in self.generate_subdependencies():
-                subdependency.fetch()
-                subdependency.set_cmake_project_data()
-                progress_bar.update()
+            for subdependencies in self.generate_subdependencies():
+                for subdependency in fetch_all(subdependencies):
+                    subdependency.set_cmake_project_data()
+                    progress_bar.update()
 
     def check(self, output=sys.stdout):
         """Check dependencies for impossible to manage patterns."""
         output.write("Checking dependencies...\n")
 
+        # group dependencies by project name, only dependencies of a same
+        # group have to be compared
+        groups: Dict[str, List[Dependency]] = {}
+        for dependency in self.dependencies:
+            groups.setdefault(dependency.cmake_project_name, []).append(dependency)
+
         for dependency in tqdm(
             self.dependencies, file=output, leave=False, unit="dependency"
         ):
             # check diamond dependencies
-            for other_dependency in self.dependencies:
+            for other_dependency in groups[dependency.cmake_project_name]:
                 if other_dependency is dependency:
                     continue
 
-                if dependency.cmake_project_name == other_dependency.cmake_project_name:
-                    # pass if the two versions exist and are the same
-                    if (
-                        dependency.cmake_project_version
-                        and dependency.cmake_project_version
-                        == other_dependency.cmake_project_version
-                    ):
-                        continue
-
-                    # pass if the two URLs and commit hash are the same
-                    if (
-                        dependency.url == other_dependency.url
-                        and dependency.git_hash == other_dependency.git_hash
-                    ):
-                        continue
-
-                    raise DiamondDependencyError(
-                        "Diamond dependency detected with two different versions:\n\n"
-                        f"{dependency.get_description()}\n\nand:\n\n"
-                        f"{other_dependency.get_description()}"
-                    )
+                # pass if the two versions exist and are the same
+                if (
+                    dependency.cmake_project_version
+                    and dependency.cmake_project_version
+                    == other_dependency.cmake_project_version
+                ):
+                    continue
+
+                # pass if the two URLs and commit hash are the same
+                if (
+                    dependency.url == other_dependency.url
+                    and dependency.git_hash == other_dependency.git_hash
+                ):
+                    continue
+
+                raise DiamondDependencyError(
+                    "Diamond dependency detected with two different versions:\n\n"
+                    f"{dependency.get_description()}\n\nand:\n\n"
+                    f"{other_dependency.get_description()}"
+                )
 
     def get_install_path(self) -> Path:
-        """Get a resolved version of the install path."""
-        return self.install_path.realpath()
+        """Get a resolved version of the install path.
+
+        The install path is resolved only once, unless it is changed.
+        """
+        if (
+            self._install_path_resolved is None
+            or self._install_path_resolved[0] != self.install_path
+        ):
+            self._install_path_resolved = (
+                self.install_path,
+                self.install_path.realpath(),
+            )
+
+        return self._install_path_resolved[1]
 
     def build(self, extra_args: list = [], output=sys.stdout):
         """Configure and build dependencies."""
         # create build cache
-        CACHE_BUILD.mkdir_p()
+        CACHE_BUILD.makedirs_p()
 
         # check CMake works
         check_cmake_exists()
 
         # build
         output.write("Building dependencies...\n")
-        for dependency in tqdm(
-            self.dependencies, file=output, leave=False, unit="dependency"
+        for _ in tqdm(
+            build_all(self.dependencies, self.get_install_path(), extra_args),
+            total=len(self.dependencies),
+            file=output,
+            leave=False,
+            unit="dependency",
         ):
-            dependency.build(self.get_install_path(), extra_args)
+            pass
 
     def install(self, output=sys.stdout):
         """Install dependencies."""
@@ -166,10 +227,14 @@ class DependencyList:
 
         # build
         output.write("Installing dependencies...\n")
-        for dependency in tqdm(
-            self.dependencies, file=output, leave=False, unit="dependency"
+        for _ in tqdm(
+            install_all(self.dependencies),
+            total=len(self.dependencies),
+            file=output,
+            leave=False,
+            unit="dependency",
         ):
-            dependency.install()
+            pass
 
 
 class DiamondDependencyError(DependenCmakeError):
@@ -0,0 +1,83 @@
+from typing import TYPE_CHECKING, Dict, List, Set
+
+from dependencmake.exceptions import DependenCmakeError
+
+if TYPE_CHECKING:  # pragma: no cover
+    from dependencmake.dependency import Dependency
+
+
+def group_by_directory(
+    dependencies: List["Dependency"],
+) -> Dict[str, List["Dependency"]]:
+    """Group dependencies sharing the same directory."""
+    groups: Dict[str, List["Dependency"]] = {}
+    for dependency in dependencies:
+        groups.setdefault(dependency.directory_name, []).append(dependency)
+
+    return groups
+
+
+def get_requirements(dependencies: List["Dependency"]) -> Dict[str, Set[str]]:
+    """Get the directories of the direct subdependencies of each directory.
+
+    Only direct subdependencies are stored, the transitive closure is never
+    computed. Parents that are not in the list are ignored.
+    """
+    requirements: Dict[str, Set[str]] = {
+        dependency.directory_name: set() for dependency in dependencies
+    }
+    for dependency in dependencies:
+        parent = dependency.parent
+        if parent is None or parent.directory_name == dependency.directory_name:
+            continue
+
+        if parent.directory_name in requirements:
+            requirements[parent.directory_name].add(dependency.directory_name)
+
+    return requirements
+
+
+def compute_order(dependencies: List["Dependency"]) -> List[List["Dependency"]]:
+    """Sort dependencies in groups to process one after the other.
+
+    Dependencies of a group only require dependencies of previous groups, so
+    dependencies of a same group can be processed concurrently. Dependencies
+    sharing the same directory appear once. Groups are computed with Kahn's
+    algorithm.
+    """
+    groups = group_by_directory(dependencies)
+    requirements = get_requirements(dependencies)
+    positions = {name: position for position, name in enumerate(groups)}
+
+    # get the directories requiring each directory
+    dependents: Dict[str, Set[str]] = {name: set() for name in requirements}
+    for name, required_names in requirements.items():
+        for required_name in required_names:
+            dependents[required_name].add(name)
+
+    remaining = {name: len(required) for name, required in requirements.items()}
+    layer = [name for name, count in remaining.items() if count == 0]
+    order = []
+    while layer:
+        order.append([groups[name][0] for name in layer])
+        next_layer = []
+        for name in layer:
+            del remaining[name]
+            for dependent in dependents[name]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    next_layer.append(dependent)
+
+        layer = sorted(next_layer, key=positions.__getitem__)
+
+    if remaining:
+        raise CircularDependencyError(
+            "Circular dependency detected between: "
+            + ", ".join(groups[name][0].name for name in remaining)
+        )
+
+    return order
+
+
+class CircularDependencyError(DependenCmakeError):
+    pass
@@ -0,0 +1,21 @@
+from argparse import Namespace
+
+from path import Path
+
+
+def link_or_copy(source: Path, directory: Path):
+    """Hard link a resource file in a directory, or copy it if not possible."""
+    try:
+        source.link(directory / source.name)
+
+    except OSError:
+        source.copy(directory)
+
+
+def make_run_args(
+    path: Path, force: bool = False, install_path: Path = None, rest: list = []
+) -> Namespace:
+    """Create command line arguments for commands working on a project."""
+    return Namespace(
+        path=Path(path), force=force, install_path=install_path, rest=list(rest)
+    )
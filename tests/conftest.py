@@ -0,0 +1,55 @@
+from io import StringIO
+from os import devnull
+from unittest.mock import patch
+
+import pytest
+from path import Path
+
+
+@pytest.fixture(scope="session", autouse=True)
+def block_network():
+    """Make tests fail if they access the network without mocking it.
+
+    Tests mocking network accesses replace these patches for their duration.
+    """
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("Tests must not access the network")
+
+    with patch("dependencmake.dependency.POOL.request", side_effect=fail), patch(
+        "git.Repo.clone_from", side_effect=fail
+    ):
+        yield
+
+
+@pytest.fixture
+def temp_directory(tmp_path):
+    """Temporary directory as a path object."""
+    return Path(tmp_path)
+
+
+@pytest.fixture(scope="session")
+def resources_directory():
+    """Directory of test resources."""
+    return Path(__file__).parent / "resources"
+
+
+@pytest.fixture(scope="session")
+def config_file(resources_directory):
+    """Config file of test resources."""
+    return resources_directory / "dependencmake.yaml"
+
+
+@pytest.fixture(scope="session")
+def null_output():
+    """Stream discarding output."""
+    with open(devnull, "w") as stream:
+        yield stream
+
+
+@pytest.fixture
+def output():
+    """Buffer to write output to."""
+    buffer = StringIO()
+    yield buffer
+    buffer.close()
@@ -1,7 +1,9 @@
 from pathlib import Path as Pathlib
+from types import SimpleNamespace
 
 import pytest
 from path import Path
+from yaml.constructor import ConstructorError
 
 from dependencmake.config import (
     ConfigNotFoundError,
@@ -9,6 +11,7 @@ from dependencmake.config import (
     check_config,
     create_config,
     get_config,
+    load_config,
 )
 
 
@@ -85,8 +88,17 @@ class TestCreateConfig:
         )
 
 
+@pytest.fixture
+def mocked_stat(mocker):
+    load_config.cache_clear()
+    mocked_stat = mocker.patch.object(Path, "stat", autospec=True)
+    mocked_stat.return_value = SimpleNamespace(st_mtime_ns=0, st_size=0)
+
+    return mocked_stat
+
+
 class TestGetConfig:
-    def test_get(self, mocker):
+    def test_get(self, mocker, mocked_stat):
         """Get a normal config."""
         mocked_exists = mocker.patch.object(Path, "exists", autospec=True)
         mocked_exists.return_value = True
@@ -99,6 +111,57 @@ class TestGetConfig:
         mocked_exists.assert_called_with(Path("path") / "dependencmake.yaml")
         mocked_text.assert_called_with(Path("path") / "dependencmake.yaml")
 
+    def test_get_cached(self, mocker, mocked_stat):
+        """Parse an unchanged config only once."""
+        mocked_exists = mocker.patch.object(Path, "exists", autospec=True)
+        mocked_exists.return_value = True
+        mocked_text = mocker.patch.object(Path, "read_text", autospec=True)
+        mocked_text.return_value = "config: [value]"
+
+        config = get_config(Path("path"))
+        config["config"].append("other value")
+        assert get_config(Path("path")) == {"config": ["value"]}
+        mocked_text.assert_called_once()
+
+        # modify file
+        mocked_stat.return_value = SimpleNamespace(st_mtime_ns=1, st_size=0)
+        get_config(Path("path"))
+        assert mocked_text.call_count == 2
+
+    def test_get_cached_dependencies(self, mocker, mocked_stat):
+        """Get a config whose dependencies can be modified safely."""
+        mocked_exists = mocker.patch.object(Path, "exists", autospec=True)
+        mocked_exists.return_value = True
+        mocked_text = mocker.patch.object(Path, "read_text", autospec=True)
+        mocked_text.return_value = "dependencies: [{name: My dep}]"
+
+        config = get_config(Path("path"))
+        config["dependencies"][0]["name"] = "My other dep"
+        assert get_config(Path("path")) == {"dependencies": [{"name": "My dep"}]}
+
+    def test_get_not_mapping(self, mocker, mocked_stat):
+        """Error when checking a config that is not a mapping."""
+        mocked_exists = mocker.patch.object(Path, "exists", autospec=True)
+        mocked_exists.return_value = True
+        mocked_text = mocker.patch.object(Path, "read_text", autospec=True)
+        mocked_text.return_value = "- dependencies"
+
+        config = get_config(Path("path"))
+        assert config == ["dependencies"]
+
+        with pytest.raises(IncorrectConfigError):
+            check_config(config)
+
+    def test_get_unsafe(self, mocker, mocked_stat):
+        """Error when getting a config with arbitrary Python objects."""
+        mocked_exists = mocker.patch.object(Path, "exists", autospec=True)
+        mocked_exists.return_value = True
+        mocked_text = mocker.patch.object(Path, "read_text", autospec=True)
+        mocked_text.return_value = "config: !!python/object/apply:len [[]]"
+
+        with pytest.raises(ConstructorError):
+            get_config(Path("path"))
+
     def test_not_found(self, mocker):
         """Error when getting not found config."""
         mocked_exists = mocker.patch.object(Path, "exists", autospec=True)
@@ -121,3 +184,9 @@ class TestCheckConfig:
         """Check a config without dependencies list."""
         with pytest.raises(IncorrectConfigError):
             check_config({})
+
+    @pytest.mark.parametrize("config", [["dependencies"], "dependencies", 42, None])
+    def test_not_mapping(self, config):
+        """Check a config that is not a mapping."""
+        with pytest.raises(IncorrectConfigError):
+            check_config(config)
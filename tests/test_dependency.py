@@ -1,14 +1,25 @@
-from io import StringIO
+import errno
+import hashlib
+import sys
+import tarfile
+from io import BytesIO, StringIO
+from os import environ, pathsep
 from re import escape
 from shutil import ReadError
-from unittest.mock import MagicMock, call
-from urllib.error import HTTPError
+from subprocess import PIPE, run
+from threading import Barrier, Event, Lock
+from time import sleep
+from types import SimpleNamespace
+from unittest.mock import PropertyMock, call
+from zipfile import ZipFile
 
 import pytest
 from furl import furl
 from git import GitCommandError
 from packaging import version
 from path import Path
+from urllib3 import HTTPResponse
+from urllib3.exceptions import HTTPError
 
 from dependencmake.cmake import CMakeBuildError, CMakeConfigureError, CMakeInstallError
 from dependencmake.dependency import (
@@ -20,13 +31,55 @@ from dependencmake.dependency import (
     CMakeProjectDataNotFoundError,
     ConfigureError,
     Dependency,
+    FetchError,
     FolderAccessError,
     FolderCopyError,
     GitRepoFetchError,
     InstallError,
     UnknownDependencyTypeError,
+    build_all,
+    download_and_extract,
+    extract,
+    fetch_all,
+    hash_url,
+    install_all,
+    parse_url,
+    rename_or_move,
 )
 from dependencmake.filesystem import CACHE_BUILD, CACHE_FETCH
+from dependencmake.graph import CircularDependencyError
+
+DEP_DIRECTORY_NAME = "my_dep_8915e96191acfcb1a94e13ee6acaac9f"
+FOLDER_DEP_DIRECTORY_NAME = "my_dep_3d3a7704ded7d6e9c4c803a199cb4afc"
+GIT_DEP_DIRECTORY_NAME = "my_git_dep_7ff12bff6f7b2b8d62f1a4d2da5e2f54"
+ZIP_DEP_DIRECTORY_NAME = "my_zip_dep_edb194f18534dda5d70f0752a5222c1a"
+LOCAL_ZIP_DEP_DIRECTORY_NAME = "my_zip_dep_dbd5edb50318ee374e08976d9d067679"
+
+
+@pytest.fixture(autouse=True)
+def fs_mocks(mocker):
+    """Mock file system and network accesses once for each test."""
+    mocked_temporary_directory_class = mocker.patch(
+        "dependencmake.dependency.TemporaryDirectory"
+    )
+    mocked_temporary_directory_class.return_value.__enter__.return_value = "temp"
+
+    return SimpleNamespace(
+        exists=mocker.patch.object(Path, "exists", autospec=True),
+        mkdir_p=mocker.patch.object(Path, "mkdir_p", autospec=True),
+        copytree=mocker.patch.object(Path, "copytree", autospec=True),
+        scandir=mocker.patch("dependencmake.dependency.scandir"),
+        rename_or_move=mocker.patch("dependencmake.dependency.rename_or_move"),
+        read_text=mocker.patch.object(Path, "read_text", autospec=True),
+        write_text=mocker.patch.object(Path, "write_text", autospec=True),
+        remove_p=mocker.patch.object(Path, "remove_p", autospec=True),
+        getmtime=mocker.patch.object(Path, "getmtime", autospec=True, return_value=0),
+        download_and_extract=mocker.patch(
+            "dependencmake.dependency.download_and_extract"
+        ),
+        extract=mocker.patch("dependencmake.dependency.extract"),
+        TemporaryDirectory=mocked_temporary_directory_class,
+    )
 
 
 @pytest.fixture
@@ -64,6 +117,14 @@ def zip_dependency():
     )
 
 
+@pytest.fixture
+def git_dependency_no_hash():
+    return Dependency(
+        name="My Git dep",
+        url="http://example.com/dependency.git",
+    )
+
+
 @pytest.fixture
 def folder_dependency():
     return Dependency(
@@ -105,143 +166,177 @@ class TestDependency:
         with pytest.raises(TypeError):
             Dependency(name="My dep")
 
-    def test_describe_dependency(self, dependency):
-        """Describe a dependency."""
-        output = StringIO()
-        dependency.describe(output)
-        lines = output.getvalue().splitlines()
-        assert lines == [
-            "Name: My dep",
-            "URL: http://example.com/dependency",
-            "Git hash: 424242",
-            "CMake arguments: -DCMAKE_ARG=ON",
-            "Jobs for building: 1",
-            "",
-            "Directory name: my_dep_6dff8f0c30c3a3e97685b1c89e0baf93",
-        ]
+    def test_import_git_lazily(self):
+        """Do not import GitPython until a Git dependency is fetched."""
+        result = run(
+            [
+                sys.executable,
+                "-c",
+                "import sys, dependencmake.__main__; print('git' in sys.modules)",
+            ],
+            stdout=PIPE,
+            check=True,
+            env={**environ, "PYTHONPATH": pathsep.join(sys.path)},
+        )
 
-    def test_describe_subdependency(self, dependency, zip_dependency):
-        """Describe a subdependency."""
-        dependency.parent = zip_dependency
-        output = StringIO()
-        dependency.describe(output)
-        lines = output.getvalue().splitlines()
-        assert lines == [
-            "Name: My dep",
-            "URL: http://example.com/dependency",
-            "Git hash: 424242",
-            "CMake arguments: -DCMAKE_ARG=ON",
-            "Jobs for building: 1",
-            "",
-            "Dependency of: My zip dep",
-            "Directory name: my_dep_6dff8f0c30c3a3e97685b1c89e0baf93",
-        ]
+        assert result.stdout.decode().strip() == "False"
 
-    def test_describe_subdir(self, subdir_dependency):
-        """Describe a dependency with CMake subdirectory."""
-        output = StringIO()
-        subdir_dependency.describe(output)
-        lines = output.getvalue().splitlines()
-        assert lines == [
-            "Name: My dep",
-            "URL: http://example.com/dependency",
-            "Directory with CMake files: subdir",
-            "",
-            "Directory name: my_dep_6dff8f0c30c3a3e97685b1c89e0baf93",
-        ]
-
-    def test_fetch_for_git(self, git_dependency, mocker):
-        """Fetch in case of a Git repository."""
-        mocked_fetch_git = mocker.patch.object(Dependency, "fetch_git")
+    def test_slots_no_dict(self):
+        """Store attributes of a dependency in slots."""
+        dependency = Dependency(name="My dep", url="http://example.com/dependency")
 
-        assert not git_dependency.fetched
-        git_dependency.fetch()
-        assert git_dependency.fetched
+        assert not hasattr(dependency, "__dict__")
+        assert dependency.git_hash == ""
+        assert dependency == Dependency(
+            name="My dep", url="http://example.com/dependency"
+        )
 
-        mocked_fetch_git.assert_called_with()
+    def test_hash_url_cached(self):
+        """Hash the same URL only once."""
+        hash_url.cache_clear()
+        Dependency(name="My dep", url="http://example.com/dependency")
+        Dependency(name="My other dep", url="http://example.com/dependency")
 
-    def test_fetch_for_archive(self, zip_dependency, mocker):
-        """Fetch in case of a zip archive."""
-        mocked_fetch_archive = mocker.patch.object(Dependency, "fetch_archive")
+        assert hash_url.cache_info().misses == 1
+        assert hash_url.cache_info().hits == 1
 
-        zip_dependency.fetch()
+    def test_hash_url_once_per_dependency(self, mocker):
+        """Hash the URL of a dependency only once during its life."""
+        hash_url.cache_clear()
+        spied_blake2b = mocker.spy(hashlib, "blake2b")
+        mocker.patch.object(Dependency, "fetch_archive", autospec=True)
+        dependency = Dependency(
+            name="My zip dep", url="http://example.com/dependency.zip"
+        )
 
-        mocked_fetch_archive.assert_called_with()
+        for _ in range(2):
+            assert dependency.directory_name == ZIP_DEP_DIRECTORY_NAME
+            dependency.describe(StringIO())
+            dependency.fetch()
 
-    def test_fetch_for_folder(self, folder_dependency, mocker):
-        """Fetch in case of a local folder."""
-        mocked_fetch_folder = mocker.patch.object(Dependency, "fetch_folder")
+        spied_blake2b.assert_called_once()
 
-        folder_dependency.fetch()
+    def test_parse_url_cached(self):
+        """Parse the same URL only once."""
+        parse_url.cache_clear()
+        dependency = Dependency(name="My dep", url="http://example.com/dependency")
+        other_dependency = Dependency(
+            name="My other dep", url="http://example.com/dependency"
+        )
 
-        mocked_fetch_folder.assert_called_with()
+        assert dependency.url_parsed is other_dependency.url_parsed
+        assert parse_url.cache_info().misses == 1
 
-    def test_fetch_for_local_archive(self, local_zip_dependency, mocker):
-        """Fetch in case of a local zip archive."""
-        mocked_fetch_archive = mocker.patch.object(Dependency, "fetch_local_archive")
+    def test_describe_dependency(self, dependency, output):
+        """Describe a dependency."""
+        dependency.describe(output)
+        assert output.getvalue() == (
+            "Name: My dep\n"
+            "URL: http://example.com/dependency\n"
+            "Git hash: 424242\n"
+            "CMake arguments: -DCMAKE_ARG=ON\n"
+            "Jobs for building: 1\n"
+            "\n"
+            f"Directory name: {DEP_DIRECTORY_NAME}\n"
+        )
 
-        local_zip_dependency.fetch()
+    def test_describe_subdependency(self, dependency, zip_dependency, output):
+        """Describe a subdependency."""
+        dependency.parent = zip_dependency
+        dependency.describe(output)
+        assert output.getvalue() == (
+            "Name: My dep\n"
+            "URL: http://example.com/dependency\n"
+            "Git hash: 424242\n"
+            "CMake arguments: -DCMAKE_ARG=ON\n"
+            "Jobs for building: 1\n"
+            "\n"
+            "Dependency of: My zip dep\n"
+            f"Directory name: {DEP_DIRECTORY_NAME}\n"
+        )
 
-        mocked_fetch_archive.assert_called_with()
+    def test_describe_subdir(self, subdir_dependency, output):
+        """Describe a dependency with CMake subdirectory."""
+        subdir_dependency.describe(output)
+        assert output.getvalue() == (
+            "Name: My dep\n"
+            "URL: http://example.com/dependency\n"
+            "Directory with CMake files: subdir\n"
+            "\n"
+            f"Directory name: {DEP_DIRECTORY_NAME}\n"
+        )
 
-    def test_fetch_unknown_http_type(self, dependency, mocker):
-        """Fetch in case of a dependency of unknown type with HTTP scheme."""
-        with pytest.raises(
-            UnknownDependencyTypeError,
-            match=escape(
-                r"Unable to manage online dependency My dep of type (no extension)"
+    @pytest.mark.parametrize(
+        "dependency_fixture,fetch_method",
+        [
+            ("git_dependency", "fetch_git"),
+            ("zip_dependency", "fetch_archive"),
+            ("folder_dependency", "fetch_folder"),
+            ("local_zip_dependency", "fetch_local_archive"),
+        ],
+    )
+    def test_fetch_for_type(self, dependency_fixture, fetch_method, request, mocker):
+        """Fetch according to the type of the dependency."""
+        dependency = request.getfixturevalue(dependency_fixture)
+        mocked_fetch_method = mocker.patch.object(Dependency, fetch_method)
+
+        assert not dependency.fetched
+        dependency.fetch()
+        assert dependency.fetched
+
+        mocked_fetch_method.assert_called_with()
+
+    @pytest.mark.parametrize(
+        "url,match",
+        [
+            (
+                "http://example.com/dependency",
+                escape(
+                    "Unable to manage online dependency My dep of type (no extension)"
+                ),
             ),
-        ):
-            dependency.fetch()
-
-    def test_fetch_unknown_file_type(self, dependency, mocker):
-        """Fetch in case of a dependency of unknown type with file scheme."""
-        dependency.url = "file:///home/me/dependency.other"
-        dependency.url_parsed = furl(dependency.url)
-        with pytest.raises(
-            UnknownDependencyTypeError,
-            match=r"Unable to manage local dependency My dep of type .other",
-        ):
-            dependency.fetch()
-
-    def test_fetch_unknown_scheme(self, dependency, mocker):
-        """Fetch in case of a dependency of unknown scheme."""
-        dependency.url = "unknown://my_server/dependency.zip"
+            (
+                "file:///home/me/dependency.other",
+                r"Unable to manage local dependency My dep of type .other",
+            ),
+            (
+                "unknown://my_server/dependency.zip",
+                r"Unable to manage dependency My dep with scheme unknown",
+            ),
+        ],
+        ids=["http_type", "file_type", "scheme"],
+    )
+    def test_fetch_unknown(self, dependency, url, match):
+        """Fetch in case of a dependency of unknown type or scheme."""
+        dependency.url = url
         dependency.url_parsed = furl(dependency.url)
-        with pytest.raises(
-            UnknownDependencyTypeError,
-            match=r"Unable to manage dependency My dep with scheme unknown",
-        ):
+        with pytest.raises(UnknownDependencyTypeError, match=match):
             dependency.fetch()
 
-    def test_fetch_git_clone(self, git_dependency, mocker):
+    def test_fetch_git_clone(self, git_dependency, mocker, fs_mocks):
         """Fetch a Git repository for the first time."""
-        mocked_exists = mocker.patch.object(Path, "exists", autospec=True)
-        mocked_exists.return_value = False
-        mocked_mkdir_p = mocker.patch.object(Path, "mkdir_p", autospec=True)
-        mocked_repo = mocker.patch("dependencmake.dependency.Repo")
+        fs_mocks.exists.return_value = False
+        mocked_repo = mocker.patch("git.Repo")
 
         git_dependency.fetch_git()
 
-        mocked_exists.assert_called_with(
-            CACHE_FETCH / "my_git_dep_b90b270cffae363d3b9ad048ba2482af"
-        )
-        mocked_mkdir_p.assert_called_with(
-            CACHE_FETCH / "my_git_dep_b90b270cffae363d3b9ad048ba2482af"
-        )
+        fs_mocks.exists.assert_called_with(CACHE_FETCH / GIT_DEP_DIRECTORY_NAME)
+        fs_mocks.mkdir_p.assert_called_with(CACHE_FETCH / GIT_DEP_DIRECTORY_NAME)
         mocked_repo.clone_from.assert_called_with(
             "http://example.com/dependency.git",
-            CACHE_FETCH / "my_git_dep_b90b270cffae363d3b9ad048ba2482af",
+            CACHE_FETCH / GIT_DEP_DIRECTORY_NAME,
+            multi_options=["--filter=blob:none"],
         )
         mocked_repo.return_value.remote.assert_not_called()
         mocked_repo.clone_from.return_value.commit.assert_called_with("424242")
+        fs_mocks.remove_p.assert_called_with(
+            CACHE_BUILD / GIT_DEP_DIRECTORY_NAME / ".dependencmake_build"
+        )
 
-    def test_fetch_git_clone_error(self, git_dependency, mocker):
+    def test_fetch_git_clone_error(self, git_dependency, mocker, fs_mocks):
         """Error when fetching a Git repository."""
-        mocked_exists = mocker.patch.object(Path, "exists", autospec=True)
-        mocked_exists.return_value = False
-        mocker.patch.object(Path, "mkdir_p", autospec=True)
-        mocked_repo = mocker.patch("dependencmake.dependency.Repo")
+        fs_mocks.exists.return_value = False
+        mocked_repo = mocker.patch("git.Repo")
         mocked_repo.clone_from.side_effect = GitCommandError("error message", "000")
 
         with pytest.raises(
@@ -250,29 +345,55 @@ class TestDependency:
         ):
             git_dependency.fetch_git()
 
-    def test_fetch_git_pull(self, git_dependency, mocker):
+    def test_fetch_git_pull(self, git_dependency, mocker, fs_mocks):
         """Fetch a Git repository that has been already fetched."""
-        mocked_exists = mocker.patch.object(Path, "exists", autospec=True)
-        mocked_exists.return_value = True
-        mocked_mkdir_p = mocker.patch.object(Path, "mkdir_p", autospec=True)
-        mocked_repo = mocker.patch("dependencmake.dependency.Repo")
+        fs_mocks.exists.return_value = True
+        mocked_repo = mocker.patch("git.Repo")
+        mocked_repo.return_value.head.commit.hexsha = "171717deadbeef"
 
         git_dependency.fetch_git()
 
-        mocked_exists.assert_called_with(
-            CACHE_FETCH / "my_git_dep_b90b270cffae363d3b9ad048ba2482af"
-        )
-        mocked_mkdir_p.assert_not_called()
+        fs_mocks.exists.assert_called_with(CACHE_FETCH / GIT_DEP_DIRECTORY_NAME)
+        fs_mocks.mkdir_p.assert_not_called()
         mocked_repo.clone_from.assert_not_called()
         mocked_repo.return_value.remote.assert_called_with()
         mocked_repo.return_value.commit.assert_called_with("424242")
 
-    def test_fetch_git_pull_no_update(self, git_dependency, mocker):
+    @pytest.mark.parametrize(
+        "new_hexsha,removed",
+        [("424242deadbeef", True), ("171717deadbeef", False)],
+        ids=["changed", "unchanged"],
+    )
+    def test_fetch_git_pull_build_stamp(
+        self, git_dependency_no_hash, mocker, fs_mocks, new_hexsha, removed
+    ):
+        """Remove the build stamp only if a pull changes the commit."""
+        fs_mocks.exists.return_value = True
+        mocked_repo = mocker.patch("git.Repo")
+        type(mocked_repo.return_value.head.commit).hexsha = PropertyMock(
+            side_effect=["171717deadbeef", new_hexsha]
+        )
+
+        git_dependency_no_hash.fetch_git()
+
+        mocked_repo.return_value.remote.assert_called_with()
+        assert fs_mocks.remove_p.called == removed
+
+    def test_fetch_git_pull_at_hash(self, git_dependency, mocker, fs_mocks):
+        """Fetch a Git repository already at the requested hash."""
+        fs_mocks.exists.return_value = True
+        mocked_repo = mocker.patch("git.Repo")
+        mocked_repo.return_value.head.commit.hexsha = "424242deadbeef"
+
+        git_dependency.fetch_git()
+
+        mocked_repo.return_value.remote.assert_not_called()
+        mocked_repo.return_value.commit.assert_not_called()
+
+    def test_fetch_git_pull_no_update(self, git_dependency, mocker, fs_mocks):
         """Fetch a Git repository has updates disabled."""
-        mocked_exists = mocker.patch.object(Path, "exists", autospec=True)
-        mocked_exists.return_value = True
-        mocker.patch.object(Path, "mkdir_p", autospec=True)
-        mocked_repo = mocker.patch("dependencmake.dependency.Repo")
+        fs_mocks.exists.return_value = True
+        mocked_repo = mocker.patch("git.Repo")
         git_dependency.git_no_update = True
 
         git_dependency.fetch_git()
@@ -280,94 +401,143 @@ class TestDependency:
         mocked_repo.clone_from.assert_not_called()
         mocked_repo.return_value.remote.assert_not_called()
 
-    def test_fetch_archive_exists(self, mocker, zip_dependency):
+    def test_fetch_archive_exists(self, zip_dependency, fs_mocks):
         """Fetch an archive already fetched."""
-        mocked_exists = mocker.patch.object(Path, "exists", autospec=True)
-        mocked_exists.return_value = True
-        mocked_urlretrieve = mocker.patch("dependencmake.dependency.urlretrieve")
+        fs_mocks.exists.return_value = True
 
         zip_dependency.fetch_archive()
 
-        mocked_exists.assert_called_with(
-            CACHE_FETCH / "my_zip_dep_355bfa4061a06c4d22ad5df3d74233a7"
-        )
-        mocked_urlretrieve.assert_not_called()
+        fs_mocks.exists.assert_called_with(CACHE_FETCH / ZIP_DEP_DIRECTORY_NAME)
+        fs_mocks.download_and_extract.assert_not_called()
+        fs_mocks.remove_p.assert_not_called()
 
-    def test_fetch_archive(self, mocker, zip_dependency):
+    def test_fetch_archive(self, mocker, zip_dependency, fs_mocks):
         """Fetch an archive."""
-        mocked_exists = mocker.patch.object(Path, "exists", autospec=True)
-        mocked_exists.return_value = False
-        mocked_temporary_directory_class = mocker.patch(
-            "dependencmake.dependency.TemporaryDirectory"
-        )
-        mocked_temporary_directory_class.return_value.__enter__.return_value = "temp"
-        mocked_urlretrieve = mocker.patch("dependencmake.dependency.urlretrieve")
-        mocked_decompress = mocker.patch.object(Dependency, "decompress")
-        mocked_decompress.return_value = Path("temp") / "extract"
+        fs_mocks.exists.return_value = False
         mocked_move_decompress_path = mocker.patch.object(
             Dependency, "move_decompress_path"
         )
 
         zip_dependency.fetch_archive()
 
-        mocked_urlretrieve.assert_called_with(
-            "http://example.com/dependency.zip", Path("temp") / "dependency.zip"
-        )
-        mocked_decompress.assert_called_with(
-            Path("temp") / "dependency.zip", Path("temp")
+        fs_mocks.mkdir_p.assert_called_with(Path("temp") / "extract")
+        fs_mocks.download_and_extract.assert_called_with(
+            "http://example.com/dependency.zip", ".zip", Path("temp") / "extract"
         )
         mocked_move_decompress_path.assert_called_with(
             Path("temp") / "extract",
-            CACHE_FETCH / "my_zip_dep_355bfa4061a06c4d22ad5df3d74233a7",
+            CACHE_FETCH / ZIP_DEP_DIRECTORY_NAME,
+        )
+        fs_mocks.remove_p.assert_called_with(
+            CACHE_BUILD / ZIP_DEP_DIRECTORY_NAME / ".dependencmake_build"
         )
 
-    def test_fetch_archive_download_error(self, mocker, zip_dependency):
-        """Error when downloading an archive."""
-        mocked_exists = mocker.patch.object(Path, "exists", autospec=True)
-        mocked_exists.return_value = False
-        mocked_temporary_directory_class = mocker.patch(
-            "dependencmake.dependency.TemporaryDirectory"
+    def test_fetch_archive_query(self, mocker, fs_mocks):
+        """Fetch an archive whose URL has a query string."""
+        fs_mocks.exists.return_value = False
+        mocker.patch.object(Dependency, "move_decompress_path")
+        dependency = Dependency(
+            name="My zip dep", url="https://example.com/v1.zip?raw=true"
         )
-        mocked_temporary_directory_class.return_value.__enter__.return_value = "temp"
-        mocked_urlretrieve = mocker.patch("dependencmake.dependency.urlretrieve")
-        mocked_urlretrieve.side_effect = HTTPError(
-            "url", "000", "error", "hdrs", MagicMock()
+
+        dependency.fetch_archive()
+
+        fs_mocks.download_and_extract.assert_called_with(
+            "https://example.com/v1.zip?raw=true", ".zip", Path("temp") / "extract"
         )
-        mocked_decompress = mocker.patch.object(Dependency, "decompress")
-        mocked_move_decompress_path = mocker.patch.object(
-            Dependency, "move_decompress_path"
+
+    @pytest.mark.parametrize(
+        "side_effect,error_class,message",
+        [
+            (
+                HTTPError("error"),
+                ArchiveDownloadError,
+                r"Cannot download My zip dep at http://example.com/dependency.zip: "
+                r".*error",
+            ),
+            (
+                ReadError("error"),
+                ArchiveDecompressError,
+                r"Cannot decompress archive of My zip dep: .*error",
+            ),
+        ],
+        ids=["download", "decompress"],
+    )
+    def test_fetch_archive_error(
+        self, zip_dependency, fs_mocks, monkeypatch, side_effect, error_class, message
+    ):
+        """Error when downloading or decompressing an archive."""
+        fs_mocks.exists.return_value = False
+        fs_mocks.download_and_extract.side_effect = side_effect
+        calls = []
+        monkeypatch.setattr(
+            Dependency,
+            "move_decompress_path",
+            lambda *args: calls.append("move_decompress_path"),
         )
 
-        with pytest.raises(
-            ArchiveDownloadError,
-            match=r"Cannot download My zip dep at http://example.com/dependency.zip: "
-            r".*error",
-        ):
+        with pytest.raises(error_class, match=message):
             zip_dependency.fetch_archive()
 
-        mocked_decompress.assert_not_called()
-        mocked_move_decompress_path.assert_not_called()
+        assert calls == []
 
-    def test_decompress(self, mocker, zip_dependency):
-        """Decompress an archive."""
-        mocked_mkdir_p = mocker.patch.object(Path, "mkdir_p", autospec=True)
-        mocked_unpack_archive = mocker.patch("dependencmake.dependency.unpack_archive")
+    def test_copy_fetched(self, zip_dependency, fs_mocks):
+        """Fetch a dependency by copying another one."""
+        fs_mocks.exists.return_value = False
+        other_zip_dependency = Dependency(
+            name="My other zip dep", url="http://example.com/dependency.zip"
+        )
+
+        other_zip_dependency.copy_fetched(zip_dependency)
+
+        fs_mocks.copytree.assert_called_with(
+            CACHE_FETCH / ZIP_DEP_DIRECTORY_NAME,
+            CACHE_FETCH / other_zip_dependency.directory_name,
+        )
+        fs_mocks.remove_p.assert_called_with(
+            CACHE_BUILD / other_zip_dependency.directory_name / ".dependencmake_build"
+        )
+
+    def test_copy_fetched_exists(self, zip_dependency, fs_mocks):
+        """Fetch a dependency already fetched by copying another one."""
+        fs_mocks.exists.return_value = True
+        other_zip_dependency = Dependency(
+            name="My other zip dep", url="http://example.com/dependency.zip"
+        )
+
+        other_zip_dependency.copy_fetched(zip_dependency)
+
+        fs_mocks.copytree.assert_not_called()
+
+    def test_copy_fetched_error(self, zip_dependency, fs_mocks):
+        """Error when fetching a dependency by copying another one."""
+        fs_mocks.exists.return_value = False
+        fs_mocks.copytree.side_effect = OSError("error")
+        other_zip_dependency = Dependency(
+            name="My other zip dep", url="http://example.com/dependency.zip"
+        )
+
+        with pytest.raises(
+            FolderCopyError,
+            match=r"Cannot copy My other zip dep from My zip dep: error",
+        ):
+            other_zip_dependency.copy_fetched(zip_dependency)
 
+    def test_decompress(self, zip_dependency, fs_mocks):
+        """Decompress an archive."""
         decompress_path = zip_dependency.decompress(
             Path("dependency.zip"), Path("temp")
         )
         assert decompress_path == Path("temp") / "extract"
 
-        mocked_mkdir_p.assert_called_with(Path("temp") / "extract")
-        mocked_unpack_archive.assert_called_with(
+        fs_mocks.mkdir_p.assert_called_with(Path("temp") / "extract")
+        fs_mocks.extract.assert_called_with(
             Path("dependency.zip"), Path("temp") / "extract"
         )
 
-    def test_decompress_error(self, mocker, zip_dependency):
+    def test_decompress_error(self, zip_dependency, fs_mocks):
         """Error when decompressing an archive."""
-        mocker.patch.object(Path, "mkdir_p", autospec=True)
-        mocked_unpack_archive = mocker.patch("dependencmake.dependency.unpack_archive")
-        mocked_unpack_archive.side_effect = ReadError("error")
+        fs_mocks.extract.side_effect = ReadError("error")
 
         with pytest.raises(
             ArchiveDecompressError,
@@ -375,81 +545,89 @@ class TestDependency:
         ):
             zip_dependency.decompress(Path("dependency.zip"), Path("temp"))
 
-    def test_move_decompress_path_single(self, mocker, dependency):
-        """Move a single directory."""
-        mocked_listdir = mocker.patch.object(Path, "listdir", autospec=True)
-        mocked_listdir.return_value = [Path("temp") / "extract" / "my_dep"]
-        mocked_move = mocker.patch.object(Path, "move", autospec=True)
-
-        dependency.move_decompress_path(Path("temp") / "extract", Path("destination"))
-
-        mocked_listdir.assert_called_with(Path("temp") / "extract")
-        mocked_move.assert_called_with(
-            Path("temp") / "extract" / "my_dep", Path("destination")
-        )
-
-    def test_move_decompress_path_single_error(self, mocker, dependency):
-        """Error when moving a single directory."""
-        mocked_listdir = mocker.patch.object(Path, "listdir", autospec=True)
-        mocked_listdir.return_value = [Path("temp") / "extract" / "my_dep"]
-        mocked_move = mocker.patch.object(Path, "move", autospec=True)
-        mocked_move.side_effect = OSError("error")
+    @pytest.mark.parametrize(
+        "entries,move_side_effect,moved_path",
+        [
+            (
+                [(Path("temp") / "extract" / "my_dep", True)],
+                None,
+                Path("temp") / "extract" / "my_dep",
+            ),
+            (
+                [(Path("temp") / "extract" / "my_dep", True)],
+                OSError("error"),
+                Path("temp") / "extract" / "my_dep",
+            ),
+            (
+                [(Path("temp") / "extract" / "file", False)],
+                None,
+                Path("temp") / "extract",
+            ),
+            (
+                [
+                    (Path("temp") / "extract" / "file1", False),
+                    (Path("temp") / "extract" / "file2", False),
+                ],
+                None,
+                Path("temp") / "extract",
+            ),
+        ],
+        ids=["single", "single_error", "single_file", "multiple"],
+    )
+    def test_move_decompress_path(
+        self, dependency, fs_mocks, entries, move_side_effect, moved_path
+    ):
+        """Move a single directory or several elements."""
+        fs_mocks.scandir.return_value.__enter__.return_value = [
+            SimpleNamespace(path=str(path), is_dir=lambda is_dir=is_dir: is_dir)
+            for path, is_dir in entries
+        ]
+        fs_mocks.rename_or_move.side_effect = move_side_effect
 
-        with pytest.raises(
-            ArchiveMoveError, match=r"Cannot move archive of My dep: error"
-        ):
+        if move_side_effect is None:
             dependency.move_decompress_path(
                 Path("temp") / "extract", Path("destination")
             )
 
-    def test_move_decompress_path_multiple(self, mocker, dependency):
-        """Move several elements."""
-        mocked_listdir = mocker.patch.object(Path, "listdir", autospec=True)
-        mocked_listdir.return_value = [
-            Path("temp") / "extract" / "file1",
-            Path("temp") / "extract" / "file2",
-        ]
-        mocked_move = mocker.patch.object(Path, "move", autospec=True)
-
-        dependency.move_decompress_path(Path("temp") / "extract", Path("destination"))
+        else:
+            with pytest.raises(
+                ArchiveMoveError, match=r"Cannot move archive of My dep: error"
+            ):
+                dependency.move_decompress_path(
+                    Path("temp") / "extract", Path("destination")
+                )
 
-        mocked_listdir.assert_called_with(Path("temp") / "extract")
-        mocked_move.assert_called_with(Path("temp") / "extract", Path("destination"))
+        fs_mocks.scandir.assert_called_with(Path("temp") / "extract")
+        fs_mocks.rename_or_move.assert_called_with(moved_path, Path("destination"))
 
-    def test_fetch_folder(self, folder_dependency, mocker):
+    def test_fetch_folder(self, folder_dependency, fs_mocks):
         """Fetch a local folder."""
-        mocked_exists = mocker.patch.object(Path, "exists", autospec=True)
-        mocked_exists.side_effect = [False, True]
-        mocked_copytree = mocker.patch.object(Path, "copytree", autospec=True)
+        fs_mocks.exists.side_effect = [False, True]
 
         folder_dependency.fetch_folder()
 
-        mocked_exists.assert_has_calls(
+        fs_mocks.exists.assert_has_calls(
             [
-                call(CACHE_FETCH / "my_dep_c1a8170a4b020c8d66673eda4859358f"),
+                call(CACHE_FETCH / FOLDER_DEP_DIRECTORY_NAME),
                 call(Path("/") / "home" / "me" / "dependency"),
             ]
         )
-        mocked_copytree.assert_called_with(
+        fs_mocks.copytree.assert_called_with(
             Path("/") / "home" / "me" / "dependency",
-            CACHE_FETCH / "my_dep_c1a8170a4b020c8d66673eda4859358f",
+            CACHE_FETCH / FOLDER_DEP_DIRECTORY_NAME,
         )
 
-    def test_fetch_folder_exists(self, folder_dependency, mocker):
+    def test_fetch_folder_exists(self, folder_dependency, fs_mocks):
         """Fetch a local folder that already exists."""
-        mocked_exists = mocker.patch.object(Path, "exists", autospec=True)
-        mocked_exists.return_value = True
-        mocked_copytree = mocker.patch.object(Path, "copytree", autospec=True)
+        fs_mocks.exists.return_value = True
 
         folder_dependency.fetch_folder()
 
-        mocked_copytree.assert_not_called()
+        fs_mocks.copytree.assert_not_called()
 
-    def test_fetch_folder_error_not_found(self, folder_dependency, mocker):
+    def test_fetch_folder_error_not_found(self, folder_dependency, fs_mocks):
         """Cannot find a local folder."""
-        mocked_exists = mocker.patch.object(Path, "exists", autospec=True)
-        mocked_exists.side_effect = [False, False]
-        mocked_copytree = mocker.patch.object(Path, "copytree", autospec=True)
+        fs_mocks.exists.side_effect = [False, False]
 
         with pytest.raises(
             FolderAccessError,
@@ -458,14 +636,12 @@ class TestDependency:
         ):
             folder_dependency.fetch_folder()
 
-        mocked_copytree.assert_not_called()
+        fs_mocks.copytree.assert_not_called()
 
-    def test_fetch_folder_error_copy(self, folder_dependency, mocker):
+    def test_fetch_folder_error_copy(self, folder_dependency, fs_mocks):
         """Error when copying a local folder."""
-        mocked_exists = mocker.patch.object(Path, "exists", autospec=True)
-        mocked_exists.side_effect = [False, True]
-        mocked_copytree = mocker.patch.object(Path, "copytree", autospec=True)
-        mocked_copytree.side_effect = OSError("error")
+        fs_mocks.exists.side_effect = [False, True]
+        fs_mocks.copytree.side_effect = OSError("error")
 
         with pytest.raises(
             FolderCopyError,
@@ -473,14 +649,9 @@ class TestDependency:
         ):
             folder_dependency.fetch_folder()
 
-    def test_fetch_local_archive(self, local_zip_dependency, mocker):
+    def test_fetch_local_archive(self, local_zip_dependency, mocker, fs_mocks):
         """Fetch a local archive."""
-        mocked_exists = mocker.patch.object(Path, "exists", autospec=True)
-        mocked_exists.side_effect = [False, True]
-        mocked_temporary_directory_class = mocker.patch(
-            "dependencmake.dependency.TemporaryDirectory"
-        )
-        mocked_temporary_directory_class.return_value.__enter__.return_value = "temp"
+        fs_mocks.exists.side_effect = [False, True]
         mocked_decompress = mocker.patch.object(Dependency, "decompress")
         mocked_decompress.return_value = Path("temp") / "extract"
         mocked_move_decompress_path = mocker.patch.object(
@@ -489,9 +660,9 @@ class TestDependency:
 
         local_zip_dependency.fetch_local_archive()
 
-        mocked_exists.assert_has_calls(
+        fs_mocks.exists.assert_has_calls(
             [
-                call(CACHE_FETCH / "my_zip_dep_235f522e2a9eb791919890436bacb0ee"),
+                call(CACHE_FETCH / LOCAL_ZIP_DEP_DIRECTORY_NAME),
                 call(Path("/") / "home" / "me" / "dependency.zip"),
             ]
         )
@@ -500,30 +671,44 @@ class TestDependency:
         )
         mocked_move_decompress_path.assert_called_with(
             Path("temp") / "extract",
-            CACHE_FETCH / "my_zip_dep_235f522e2a9eb791919890436bacb0ee",
+            CACHE_FETCH / LOCAL_ZIP_DEP_DIRECTORY_NAME,
+        )
+        fs_mocks.remove_p.assert_called_with(
+            CACHE_BUILD / LOCAL_ZIP_DEP_DIRECTORY_NAME / ".dependencmake_build"
         )
 
-    def test_fetch_local_archive_exists(self, local_zip_dependency, mocker):
+    def test_fetch_local_archive_exists(
+        self, local_zip_dependency, fs_mocks, monkeypatch
+    ):
         """Fetch a local archive that already exists."""
-        mocked_exists = mocker.patch.object(Path, "exists", autospec=True)
-        mocked_exists.return_value = True
-        mocked_decompress = mocker.patch.object(Dependency, "decompress")
-        mocked_move_decompress_path = mocker.patch.object(
-            Dependency, "move_decompress_path"
+        fs_mocks.exists.return_value = True
+        calls = []
+        monkeypatch.setattr(
+            Dependency, "decompress", lambda *args: calls.append("decompress")
+        )
+        monkeypatch.setattr(
+            Dependency,
+            "move_decompress_path",
+            lambda *args: calls.append("move_decompress_path"),
         )
 
         local_zip_dependency.fetch_local_archive()
 
-        mocked_decompress.assert_not_called()
-        mocked_move_decompress_path.assert_not_called()
+        assert calls == []
 
-    def test_fetch_local_archive_error_not_found(self, local_zip_dependency, mocker):
+    def test_fetch_local_archive_error_not_found(
+        self, local_zip_dependency, fs_mocks, monkeypatch
+    ):
         """Cannot access a local archive."""
-        mocked_exists = mocker.patch.object(Path, "exists", autospec=True)
-        mocked_exists.side_effect = [False, False]
-        mocked_decompress = mocker.patch.object(Dependency, "decompress")
-        mocked_move_decompress_path = mocker.patch.object(
-            Dependency, "move_decompress_path"
+        fs_mocks.exists.side_effect = [False, False]
+        calls = []
+        monkeypatch.setattr(
+            Dependency, "decompress", lambda *args: calls.append("decompress")
+        )
+        monkeypatch.setattr(
+            Dependency,
+            "move_decompress_path",
+            lambda *args: calls.append("move_decompress_path"),
         )
 
         with pytest.raises(
@@ -533,38 +718,26 @@ class TestDependency:
         ):
             local_zip_dependency.fetch_local_archive()
 
-        mocked_decompress.assert_not_called()
-        mocked_move_decompress_path.assert_not_called()
+        assert calls == []
 
-    def test_describe_after_fetch(self, zip_dependency, mocker):
+    def test_describe_after_fetch(self, zip_dependency, fs_mocks, monkeypatch, output):
         """Describe a dependency."""
-        mocked_exists = mocker.patch.object(Path, "exists", autospec=True)
-        mocked_exists.return_value = False
-        mocker.patch.object(Path, "mkdir_p", autospec=True)
-        mocked_temporary_directory_class = mocker.patch(
-            "dependencmake.dependency.TemporaryDirectory"
-        )
-        mocked_temporary_directory_class.return_value.__enter__.return_value = "temp"
-        mocker.patch("dependencmake.dependency.urlretrieve")
-        mocker.patch("dependencmake.dependency.unpack_archive")
-        mocker.patch.object(Dependency, "move_decompress_path")
+        fs_mocks.exists.return_value = False
+        monkeypatch.setattr(Dependency, "move_decompress_path", lambda *args: None)
 
-        output = StringIO()
         zip_dependency.fetch()
         zip_dependency.describe(output)
-        lines = output.getvalue().splitlines()
-        assert lines == [
-            "Name: My zip dep",
-            "URL: http://example.com/dependency.zip",
-            "",
-            "Directory name: my_zip_dep_355bfa4061a06c4d22ad5df3d74233a7",
-            "Fetched",
-        ]
+        assert output.getvalue() == (
+            "Name: My zip dep\n"
+            "URL: http://example.com/dependency.zip\n"
+            "\n"
+            f"Directory name: {ZIP_DEP_DIRECTORY_NAME}\n"
+            "Fetched\n"
+        )
 
-    def test_refresh_git(self, git_dependency, mocker):
+    def test_refresh_git(self, git_dependency, fs_mocks):
         """Refresh a Git dependency."""
-        mocked_exists = mocker.patch.object(Path, "exists", autospec=True)
-        mocked_exists.return_value = True
+        fs_mocks.exists.return_value = True
 
         assert not git_dependency.fetched
         assert not git_dependency.built
@@ -572,10 +745,9 @@ class TestDependency:
         assert git_dependency.fetched
         assert git_dependency.built
 
-    def test_refresh_zip(self, zip_dependency, mocker):
+    def test_refresh_zip(self, zip_dependency, fs_mocks):
         """Refresh an archive dependency."""
-        mocked_exists = mocker.patch.object(Path, "exists", autospec=True)
-        mocked_exists.return_value = True
+        fs_mocks.exists.return_value = True
 
         assert not zip_dependency.fetched
         assert not zip_dependency.built
@@ -583,17 +755,30 @@ class TestDependency:
         assert zip_dependency.fetched
         assert zip_dependency.built
 
+    def test_refresh_fetch_zip(self, zip_dependency, fs_mocks):
+        """Check the fetch cache only once when refreshing then fetching."""
+        fs_mocks.exists.return_value = True
+
+        zip_dependency.refresh()
+        zip_dependency.fetch()
+
+        assert (
+            fs_mocks.exists.call_args_list.count(
+                call(CACHE_FETCH / ZIP_DEP_DIRECTORY_NAME)
+            )
+            == 1
+        )
+        fs_mocks.download_and_extract.assert_not_called()
+
     def test_build(self, mocker, dependency):
         """Build a dependency."""
         mocked_cmake_lists_file_exists = mocker.patch(
-            "dependencmake.dependency.check_cmake_lists_file_exists", autospec=True
+            "dependencmake.dependency.check_cmake_lists_file_exists"
         )
         mocked_cmake_configure = mocker.patch(
-            "dependencmake.dependency.cmake_configure", autospec=True
-        )
-        mocked_cmake_build = mocker.patch(
-            "dependencmake.dependency.cmake_build", autospec=True
+            "dependencmake.dependency.cmake_configure"
         )
+        mocked_cmake_build = mocker.patch("dependencmake.dependency.cmake_build")
         mocker.patch("dependencmake.dependency.CPU_CORES", 1)
 
         assert not dependency.built
@@ -601,55 +786,57 @@ class TestDependency:
         assert dependency.build
 
         mocked_cmake_lists_file_exists.assert_called_with(
-            CACHE_FETCH / "my_dep_6dff8f0c30c3a3e97685b1c89e0baf93"
+            CACHE_FETCH / DEP_DIRECTORY_NAME
         )
         mocked_cmake_configure.assert_called_with(
-            CACHE_FETCH / "my_dep_6dff8f0c30c3a3e97685b1c89e0baf93",
-            CACHE_BUILD / "my_dep_6dff8f0c30c3a3e97685b1c89e0baf93",
+            CACHE_FETCH / DEP_DIRECTORY_NAME,
+            CACHE_BUILD / DEP_DIRECTORY_NAME,
             Path("install"),
             ["-DCMAKE_ARG=ON"],
         )
-        mocked_cmake_build.assert_called_with(
-            CACHE_BUILD / "my_dep_6dff8f0c30c3a3e97685b1c89e0baf93", 1
-        )
+        mocked_cmake_build.assert_called_with(CACHE_BUILD / DEP_DIRECTORY_NAME, 1)
 
     def test_build_subdir(self, mocker, subdir_dependency):
         """Build a dependency with source in a subdirectory."""
         mocked_cmake_lists_file_exists = mocker.patch(
-            "dependencmake.dependency.check_cmake_lists_file_exists", autospec=True
+            "dependencmake.dependency.check_cmake_lists_file_exists"
         )
         mocked_cmake_configure = mocker.patch(
-            "dependencmake.dependency.cmake_configure", autospec=True
-        )
-        mocked_cmake_build = mocker.patch(
-            "dependencmake.dependency.cmake_build", autospec=True
+            "dependencmake.dependency.cmake_configure"
         )
+        mocked_cmake_build = mocker.patch("dependencmake.dependency.cmake_build")
         mocker.patch("dependencmake.dependency.CPU_CORES", 1)
 
         subdir_dependency.build(Path("install"))
 
         mocked_cmake_lists_file_exists.assert_called_with(
-            CACHE_FETCH / "my_dep_6dff8f0c30c3a3e97685b1c89e0baf93" / "subdir"
+            CACHE_FETCH / DEP_DIRECTORY_NAME / "subdir"
         )
         mocked_cmake_configure.assert_called_with(
-            CACHE_FETCH / "my_dep_6dff8f0c30c3a3e97685b1c89e0baf93" / "subdir",
-            CACHE_BUILD / "my_dep_6dff8f0c30c3a3e97685b1c89e0baf93",
+            CACHE_FETCH / DEP_DIRECTORY_NAME / "subdir",
+            CACHE_BUILD / DEP_DIRECTORY_NAME,
             Path("install"),
             [],
         )
-        mocked_cmake_build.assert_called_with(
-            CACHE_BUILD / "my_dep_6dff8f0c30c3a3e97685b1c89e0baf93", 3
-        )
+        mocked_cmake_build.assert_called_with(CACHE_BUILD / DEP_DIRECTORY_NAME, 3)
+
+    def test_build_jobs(self, mocker, subdir_dependency):
+        """Build a dependency with the number of jobs passed."""
+        mocker.patch("dependencmake.dependency.check_cmake_lists_file_exists")
+        mocker.patch("dependencmake.dependency.cmake_configure")
+        mocked_cmake_build = mocker.patch("dependencmake.dependency.cmake_build")
+
+        subdir_dependency.build(Path("install"), jobs=2)
+
+        mocked_cmake_build.assert_called_with(CACHE_BUILD / DEP_DIRECTORY_NAME, 2)
 
     def test_build_extra_arguments(self, mocker, dependency):
         """Build a dependency with extra CMake arguments passed."""
-        mocker.patch(
-            "dependencmake.dependency.check_cmake_lists_file_exists", autospec=True
-        )
+        mocker.patch("dependencmake.dependency.check_cmake_lists_file_exists")
         mocked_cmake_configure = mocker.patch(
-            "dependencmake.dependency.cmake_configure", autospec=True
+            "dependencmake.dependency.cmake_configure"
         )
-        mocker.patch("dependencmake.dependency.cmake_build", autospec=True)
+        mocker.patch("dependencmake.dependency.cmake_build")
         mocker.patch("dependencmake.dependency.CPU_CORES", 1)
 
         assert not dependency.built
@@ -657,24 +844,20 @@ class TestDependency:
         assert dependency.build
 
         mocked_cmake_configure.assert_called_with(
-            CACHE_FETCH / "my_dep_6dff8f0c30c3a3e97685b1c89e0baf93",
-            CACHE_BUILD / "my_dep_6dff8f0c30c3a3e97685b1c89e0baf93",
+            CACHE_FETCH / DEP_DIRECTORY_NAME,
+            CACHE_BUILD / DEP_DIRECTORY_NAME,
             Path("install"),
             ["-DCMAKE_ARG=ON", "-DCMAKE_ARG1=ON", "-DCMAKE_ARG2=OFF"],
         )
 
     def test_build_error_configure(self, mocker, dependency):
         """Configure error when building a dependency."""
-        mocker.patch(
-            "dependencmake.dependency.check_cmake_lists_file_exists", autospec=True
-        )
+        mocker.patch("dependencmake.dependency.check_cmake_lists_file_exists")
         mocked_cmake_configure = mocker.patch(
-            "dependencmake.dependency.cmake_configure", autospec=True
+            "dependencmake.dependency.cmake_configure"
         )
         mocked_cmake_configure.side_effect = CMakeConfigureError("error")
-        mocked_cmake_build = mocker.patch(
-            "dependencmake.dependency.cmake_build", autospec=True
-        )
+        mocked_cmake_build = mocker.patch("dependencmake.dependency.cmake_build")
         mocker.patch("dependencmake.dependency.CPU_CORES", 1)
 
         with pytest.raises(ConfigureError, match=r"Cannot configure My dep: error"):
@@ -684,57 +867,180 @@ class TestDependency:
 
     def test_build_error_build(self, mocker, dependency):
         """Build error when building a dependency."""
-        mocker.patch(
-            "dependencmake.dependency.check_cmake_lists_file_exists", autospec=True
-        )
-        mocker.patch("dependencmake.dependency.cmake_configure", autospec=True)
-        mocked_cmake_build = mocker.patch(
-            "dependencmake.dependency.cmake_build", autospec=True
-        )
+        mocker.patch("dependencmake.dependency.check_cmake_lists_file_exists")
+        mocker.patch("dependencmake.dependency.cmake_configure")
+        mocked_cmake_build = mocker.patch("dependencmake.dependency.cmake_build")
         mocked_cmake_build.side_effect = CMakeBuildError("error")
         mocker.patch("dependencmake.dependency.CPU_CORES", 1)
 
         with pytest.raises(BuildError, match=r"Cannot build My dep: error"):
             dependency.build(Path("install"))
 
-    def test_describe_after_build(self, zip_dependency, mocker):
-        """Describe a dependency after build."""
-        mocker.patch(
-            "dependencmake.dependency.check_cmake_lists_file_exists", autospec=True
+    def test_build_cache_hit(self, mocker, zip_dependency, fs_mocks, monkeypatch):
+        """Skip the build of a dependency already built with the same key."""
+        monkeypatch.delenv("DEPENDENCMAKE_NO_CACHE", raising=False)
+        fs_mocks.exists.return_value = True
+        fs_mocks.read_text.return_value = zip_dependency.get_build_key(Path("install"))
+        mocked_cmake_configure = mocker.patch(
+            "dependencmake.dependency.cmake_configure"
+        )
+        mocked_cmake_build = mocker.patch("dependencmake.dependency.cmake_build")
+
+        assert not zip_dependency.build(Path("install"))
+        assert zip_dependency.built
+
+        fs_mocks.read_text.assert_called_with(
+            CACHE_BUILD / ZIP_DEP_DIRECTORY_NAME / ".dependencmake_build"
+        )
+        mocked_cmake_configure.assert_not_called()
+        mocked_cmake_build.assert_not_called()
+
+    def test_build_cache_miss(self, mocker, zip_dependency, fs_mocks, monkeypatch):
+        """Build a dependency already built with another key."""
+        monkeypatch.delenv("DEPENDENCMAKE_NO_CACHE", raising=False)
+        fs_mocks.exists.return_value = True
+        fs_mocks.read_text.return_value = zip_dependency.get_build_key(Path("other"))
+        mocker.patch("dependencmake.dependency.check_cmake_lists_file_exists")
+        mocked_cmake_configure = mocker.patch(
+            "dependencmake.dependency.cmake_configure"
+        )
+        mocked_cmake_build = mocker.patch("dependencmake.dependency.cmake_build")
+
+        assert zip_dependency.build(Path("install"))
+        assert zip_dependency.built
+
+        stamp_path = CACHE_BUILD / ZIP_DEP_DIRECTORY_NAME / ".dependencmake_build"
+        mocked_cmake_configure.assert_called()
+        mocked_cmake_build.assert_called()
+        fs_mocks.remove_p.assert_any_call(stamp_path)
+        fs_mocks.write_text.assert_called_with(
+            stamp_path, zip_dependency.get_build_key(Path("install"))
+        )
+
+    def test_build_configured(self, mocker, folder_dependency, fs_mocks, monkeypatch):
+        """Build a dependency already configured with the same key."""
+        monkeypatch.delenv("DEPENDENCMAKE_NO_CACHE", raising=False)
+        fs_mocks.exists.return_value = True
+        fs_mocks.read_text.return_value = folder_dependency.get_build_key(
+            Path("install")
+        )
+        mocker.patch("dependencmake.dependency.check_cmake_lists_file_exists")
+        mocked_cmake_configure = mocker.patch(
+            "dependencmake.dependency.cmake_configure"
+        )
+        mocked_cmake_build = mocker.patch("dependencmake.dependency.cmake_build")
+
+        folder_dependency.build(Path("install"))
+
+        fs_mocks.exists.assert_any_call(
+            CACHE_BUILD / FOLDER_DEP_DIRECTORY_NAME / "CMakeCache.txt"
+        )
+        mocked_cmake_configure.assert_not_called()
+        mocked_cmake_build.assert_called()
+
+    @pytest.mark.parametrize(
+        "stamp_key,lists_file_mtime",
+        [("other", 0), (None, 1)],
+        ids=["arguments_changed", "lists_file_changed"],
+    )
+    def test_build_configured_outdated(
+        self,
+        mocker,
+        folder_dependency,
+        fs_mocks,
+        monkeypatch,
+        stamp_key,
+        lists_file_mtime,
+    ):
+        """Configure again a dependency which configuration is outdated."""
+        monkeypatch.delenv("DEPENDENCMAKE_NO_CACHE", raising=False)
+        key = folder_dependency.get_build_key(Path("install"))
+        fs_mocks.exists.return_value = True
+        fs_mocks.read_text.return_value = stamp_key or key
+        fs_mocks.getmtime.side_effect = lambda path: (
+            lists_file_mtime if path.name == "CMakeLists.txt" else 0
+        )
+        mocker.patch("dependencmake.dependency.check_cmake_lists_file_exists")
+        mocked_cmake_configure = mocker.patch(
+            "dependencmake.dependency.cmake_configure"
+        )
+        mocker.patch("dependencmake.dependency.cmake_build")
+
+        folder_dependency.build(Path("install"))
+
+        stamp_path = (
+            CACHE_BUILD / FOLDER_DEP_DIRECTORY_NAME / ".dependencmake_configure"
         )
+        mocked_cmake_configure.assert_called()
+        fs_mocks.remove_p.assert_called_with(stamp_path)
+        fs_mocks.write_text.assert_called_with(stamp_path, key)
+
+    @pytest.mark.parametrize(
+        "dependency_name,no_cache",
+        [
+            ("zip_dependency", "1"),
+            ("folder_dependency", ""),
+            ("local_zip_dependency", ""),
+            ("git_dependency_no_hash", ""),
+        ],
+        ids=["disabled", "folder", "local_archive", "git_no_hash"],
+    )
+    def test_build_not_cacheable(
+        self, mocker, fs_mocks, monkeypatch, request, dependency_name, no_cache
+    ):
+        """Always build a dependency which build cannot be reused."""
+        monkeypatch.setenv("DEPENDENCMAKE_NO_CACHE", no_cache)
+        dependency = request.getfixturevalue(dependency_name)
+        fs_mocks.exists.return_value = True
+        fs_mocks.read_text.return_value = dependency.get_build_key(Path("install"))
+        mocker.patch("dependencmake.dependency.check_cmake_lists_file_exists")
+        mocker.patch("dependencmake.dependency.cmake_configure")
+        mocked_cmake_build = mocker.patch("dependencmake.dependency.cmake_build")
+
+        dependency.build(Path("install"))
+
+        mocked_cmake_build.assert_called()
+        assert all(
+            args[0].name != ".dependencmake_build"
+            for args, _ in fs_mocks.write_text.call_args_list
+        )
+
+    def test_get_build_key(self, zip_dependency):
+        """Get different build keys for different settings."""
+        key = zip_dependency.get_build_key(Path("install"))
+
+        assert key == zip_dependency.get_build_key(Path("install"))
+        assert key != zip_dependency.get_build_key(Path("other"))
+        assert key != zip_dependency.get_build_key(Path("install"), ["-DARG=ON"])
+
+    def test_describe_after_build(self, zip_dependency, mocker, output):
+        """Describe a dependency after build."""
+        mocker.patch("dependencmake.dependency.check_cmake_lists_file_exists")
         mocker.patch("dependencmake.cmake.run")
 
-        output = StringIO()
         zip_dependency.build(Path("install"))
         zip_dependency.describe(output)
-        lines = output.getvalue().splitlines()
-        assert lines == [
-            "Name: My zip dep",
-            "URL: http://example.com/dependency.zip",
-            "",
-            "Directory name: my_zip_dep_355bfa4061a06c4d22ad5df3d74233a7",
-            "Built",
-        ]
+        assert output.getvalue() == (
+            "Name: My zip dep\n"
+            "URL: http://example.com/dependency.zip\n"
+            "\n"
+            f"Directory name: {ZIP_DEP_DIRECTORY_NAME}\n"
+            "Built\n"
+        )
 
     def test_install(self, mocker, dependency):
         """Install a dependency."""
-        mocked_cmake_install = mocker.patch(
-            "dependencmake.dependency.cmake_install", autospec=True
-        )
+        mocked_cmake_install = mocker.patch("dependencmake.dependency.cmake_install")
 
         assert not dependency.installed
         dependency.install()
         assert dependency.installed
 
-        mocked_cmake_install.assert_called_with(
-            CACHE_BUILD / "my_dep_6dff8f0c30c3a3e97685b1c89e0baf93"
-        )
+        mocked_cmake_install.assert_called_with(CACHE_BUILD / DEP_DIRECTORY_NAME)
 
     def test_install_error(self, mocker, dependency):
         """Error when installing a dependency."""
-        mocked_cmake_install = mocker.patch(
-            "dependencmake.dependency.cmake_install", autospec=True
-        )
+        mocked_cmake_install = mocker.patch("dependencmake.dependency.cmake_install")
         mocked_cmake_install.side_effect = CMakeInstallError("error")
 
         with pytest.raises(InstallError, match=r"Cannot install My dep: error"):
@@ -743,7 +1049,7 @@ class TestDependency:
     def test_set_cmake_project_data(self, mocker, dependency):
         """Set dependency CMake data."""
         mocked_get_project_data = mocker.patch(
-            "dependencmake.dependency.get_project_data", autoset=True
+            "dependencmake.dependency.get_project_data"
         )
         mocked_get_project_data.return_value = {
             "name": "MyProjectName",
@@ -759,7 +1065,7 @@ class TestDependency:
     def test_set_cmake_project_data_no_version(self, mocker, dependency):
         """Set dependency CMake data without version."""
         mocked_get_project_data = mocker.patch(
-            "dependencmake.dependency.get_project_data", autoset=True
+            "dependencmake.dependency.get_project_data"
         )
         mocked_get_project_data.return_value = {
             "name": "MyProjectName",
@@ -773,9 +1079,600 @@ class TestDependency:
     def test_set_cmake_project_data_not_found(self, mocker, dependency):
         """Unable to set dependency CMake data."""
         mocked_get_project_data = mocker.patch(
-            "dependencmake.dependency.get_project_data", autoset=True
+            "dependencmake.dependency.get_project_data"
         )
         mocked_get_project_data.return_value = None
 
         with pytest.raises(CMakeProjectDataNotFoundError):
             dependency.set_cmake_project_data()
+
+
+def make_response(body: bytes, status: int = 200, reason: str = "OK"):
+    return HTTPResponse(
+        body=BytesIO(body), status=status, reason=reason, preload_content=False
+    )
+
+
+class TestDownloadAndExtract:
+    def test_download_and_extract_zip(self, mocker, tmp_path):
+        """Download and extract a zip archive."""
+        content = BytesIO()
+        with ZipFile(content, "w") as archive:
+            archive.writestr("my_dep/file", "content")
+
+        mocked_request = mocker.patch("dependencmake.dependency.POOL.request")
+        mocked_request.return_value = make_response(content.getvalue())
+
+        download_and_extract("http://example.com/dependency.zip", ".zip", tmp_path)
+
+        assert (tmp_path / "my_dep" / "file").read_text() == "content"
+        mocked_request.assert_called_with(
+            "GET", "http://example.com/dependency.zip", preload_content=False
+        )
+
+    def test_download_and_extract_zip_query(self, mocker, tmp_path):
+        """Download and extract a zip archive whose URL has a query string."""
+        content = BytesIO()
+        with ZipFile(content, "w") as archive:
+            archive.writestr("my_dep/file", "content")
+
+        mocked_request = mocker.patch("dependencmake.dependency.POOL.request")
+        mocked_request.return_value = make_response(content.getvalue())
+
+        download_and_extract("https://example.com/v1.zip?raw=true", ".zip", tmp_path)
+
+        assert (tmp_path / "my_dep" / "file").read_text() == "content"
+
+    def test_download_and_extract_tar(self, mocker, tmp_path):
+        """Download and extract a tar archive as a stream."""
+        content = BytesIO()
+        with tarfile.open(fileobj=content, mode="w:gz") as archive:
+            info = tarfile.TarInfo("my_dep/file")
+            info.size = len(b"content")
+            archive.addfile(info, BytesIO(b"content"))
+
+        mocked_request = mocker.patch("dependencmake.dependency.POOL.request")
+        mocked_request.return_value = make_response(content.getvalue())
+
+        download_and_extract("http://example.com/dependency.tgz", ".tgz", tmp_path)
+
+        assert (tmp_path / "my_dep" / "file").read_text() == "content"
+
+    def test_download_and_extract_error(self, mocker, tmp_path):
+        """Error when downloading an archive."""
+        response = make_response(b"Page not found", 404, "Not Found")
+        mocked_request = mocker.patch("dependencmake.dependency.POOL.request")
+        mocked_request.return_value = response
+
+        with pytest.raises(HTTPError, match=r"HTTP Error 404: Not Found"):
+            download_and_extract("http://example.com/dependency.zip", ".zip", tmp_path)
+
+        assert list(tmp_path.iterdir()) == []
+        assert response.tell() == len(b"Page not found")
+
+    @pytest.mark.parametrize(
+        "url,extension",
+        [
+            ("http://example.com/dependency.zip", ".zip"),
+            ("http://example.com/dependency.tgz", ".tgz"),
+        ],
+        ids=["zip", "tar"],
+    )
+    def test_download_and_extract_invalid(self, mocker, tmp_path, url, extension):
+        """Error when extracting an invalid archive."""
+        response = make_response(b"invalid" * 1024)
+        mocked_request = mocker.patch("dependencmake.dependency.POOL.request")
+        mocked_request.return_value = response
+
+        with pytest.raises(ReadError):
+            download_and_extract(url, extension, tmp_path)
+
+        assert response.tell() == len(b"invalid" * 1024)
+
+
+class TestRenameOrMove:
+    def test_rename_or_move(self, mocker):
+        """Rename a directory."""
+        mocked_rename = mocker.patch("dependencmake.dependency.rename")
+        mocked_move = mocker.patch("dependencmake.dependency.move")
+
+        rename_or_move(Path("source"), Path("destination"))
+
+        mocked_rename.assert_called_with(Path("source"), Path("destination"))
+        mocked_move.assert_not_called()
+
+    def test_rename_or_move_other_file_system(self, mocker):
+        """Move a directory to another file system."""
+        mocked_rename = mocker.patch("dependencmake.dependency.rename")
+        mocked_rename.side_effect = OSError(errno.EXDEV, "error")
+        mocked_move = mocker.patch("dependencmake.dependency.move")
+
+        rename_or_move(Path("source"), Path("destination"))
+
+        mocked_move.assert_called_with(Path("source"), Path("destination"))
+
+    def test_rename_or_move_error(self, mocker):
+        """Error when renaming a directory."""
+        mocked_rename = mocker.patch("dependencmake.dependency.rename")
+        mocked_rename.side_effect = OSError(errno.EACCES, "error")
+        mocked_move = mocker.patch("dependencmake.dependency.move")
+
+        with pytest.raises(OSError):
+            rename_or_move(Path("source"), Path("destination"))
+
+        mocked_move.assert_not_called()
+
+
+@pytest.fixture
+def tar_archive(tmp_path):
+    archive_path = tmp_path / "dependency.tar.gz"
+    with tarfile.open(archive_path, mode="w:gz") as archive:
+        info = tarfile.TarInfo("my_dep/file")
+        info.size = len(b"content")
+        archive.addfile(info, BytesIO(b"content"))
+        link_info = tarfile.TarInfo("my_dep/link")
+        link_info.type = tarfile.LNKTYPE
+        link_info.linkname = "my_dep/file"
+        archive.addfile(link_info)
+
+    return archive_path
+
+
+class TestExtract:
+    @pytest.mark.parametrize(
+        "use_libarchive", [True, False], ids=["libarchive", "shutil"]
+    )
+    def test_extract(self, tar_archive, tmp_path, monkeypatch, use_libarchive):
+        """Extract a local archive."""
+        if use_libarchive:
+            pytest.importorskip("libarchive")
+
+        else:
+            monkeypatch.setattr("dependencmake.dependency.libarchive", None)
+
+        extract(tar_archive, tmp_path / "extract")
+
+        assert (tmp_path / "extract" / "my_dep" / "file").read_text() == "content"
+        assert (tmp_path / "extract" / "my_dep" / "link").read_text() == "content"
+
+    @pytest.mark.parametrize(
+        "use_libarchive", [True, False], ids=["libarchive", "shutil"]
+    )
+    def test_extract_error(self, tmp_path, monkeypatch, use_libarchive):
+        """Error when extracting an invalid local archive."""
+        if use_libarchive:
+            pytest.importorskip("libarchive")
+
+        else:
+            monkeypatch.setattr("dependencmake.dependency.libarchive", None)
+
+        archive_path = tmp_path / "dependency.tar.gz"
+        archive_path.write_bytes(b"invalid")
+
+        with pytest.raises(ReadError):
+            extract(archive_path, tmp_path / "extract")
+
+    @pytest.mark.parametrize(
+        "use_libarchive", [True, False], ids=["libarchive", "shutil"]
+    )
+    @pytest.mark.parametrize(
+        "unsafe_name", ["/escaped/file", "../escaped/file"], ids=["absolute", "parent"]
+    )
+    def test_extract_unsafe_member(
+        self, tmp_path, monkeypatch, use_libarchive, unsafe_name
+    ):
+        """Skip members escaping the given directory."""
+        if use_libarchive:
+            pytest.importorskip("libarchive")
+
+        else:
+            monkeypatch.setattr("dependencmake.dependency.libarchive", None)
+
+        archive_path = tmp_path / "dependency.zip"
+        extract_path = tmp_path / "extract" / "path"
+        with ZipFile(archive_path, "w") as archive:
+            archive.writestr("my_dep/file", "content")
+            # make an absolute name point to the temporary directory
+            archive.writestr(
+                (
+                    str(tmp_path / "escaped" / "file")
+                    if unsafe_name.startswith("/")
+                    else unsafe_name
+                ),
+                "content",
+            )
+
+        extract(archive_path, extract_path)
+
+        assert (extract_path / "my_dep" / "file").read_text() == "content"
+        assert not (tmp_path / "escaped").exists()
+        assert not (tmp_path / "extract" / "escaped").exists()
+        assert not (extract_path / "escaped").exists()
+        assert not (extract_path / "tmp").exists()
+
+
+class TestFetchAll:
+    def test_fetch_all(self, git_dependency, zip_dependency, mocker):
+        """Fetch several dependencies concurrently."""
+        # each fetch waits for the other one, so they must run concurrently
+        barrier = Barrier(2, timeout=5)
+        mocked_fetch_git = mocker.patch.object(
+            Dependency, "fetch_git", side_effect=barrier.wait
+        )
+        mocked_fetch_archive = mocker.patch.object(
+            Dependency, "fetch_archive", side_effect=barrier.wait
+        )
+
+        fetched_dependencies = list(fetch_all([git_dependency, zip_dependency]))
+
+        assert len(fetched_dependencies) == 2
+        assert git_dependency in fetched_dependencies
+        assert zip_dependency in fetched_dependencies
+        assert git_dependency.fetched
+        assert zip_dependency.fetched
+        mocked_fetch_git.assert_called_with()
+        mocked_fetch_archive.assert_called_with()
+
+    def test_fetch_all_same_source(self, zip_dependency, mocker, fs_mocks):
+        """Fetch once dependencies with the same source."""
+        same_zip_dependency = Dependency(
+            name="My zip dep", url="http://example.com/dependency.zip"
+        )
+        other_zip_dependency = Dependency(
+            name="My other zip dep", url="http://example.com/dependency.zip"
+        )
+        fs_mocks.exists.return_value = False
+        mocked_fetch_archive = mocker.patch.object(Dependency, "fetch_archive")
+
+        fetched_dependencies = list(
+            fetch_all([zip_dependency, same_zip_dependency, other_zip_dependency])
+        )
+
+        assert len(fetched_dependencies) == 3
+        assert same_zip_dependency.fetched
+        assert other_zip_dependency.fetched
+        mocked_fetch_archive.assert_called_once_with()
+        fs_mocks.copytree.assert_called_once_with(
+            CACHE_FETCH / ZIP_DEP_DIRECTORY_NAME,
+            CACHE_FETCH / other_zip_dependency.directory_name,
+        )
+
+    def test_fetch_all_same_source_fetched(
+        self, git_dependency_no_hash, mocker, fs_mocks
+    ):
+        """Fetch again dependencies with the same source already fetched."""
+        other_git_dependency = Dependency(
+            name="My other Git dep", url="http://example.com/dependency.git"
+        )
+        fs_mocks.exists.return_value = True
+        mocked_fetch_git = mocker.patch.object(Dependency, "fetch_git")
+
+        fetched_dependencies = list(
+            fetch_all([git_dependency_no_hash, other_git_dependency])
+        )
+
+        assert len(fetched_dependencies) == 2
+        assert other_git_dependency.fetched
+        assert mocked_fetch_git.call_count == 2
+        fs_mocks.copytree.assert_not_called()
+
+    def test_fetch_all_same_directory(
+        self, git_dependency, git_dependency_no_hash, mocker
+    ):
+        """Fetch sequentially dependencies with the same directory."""
+        # a concurrent fetch would find the lock already acquired
+        lock = Lock()
+
+        def fetch_git():
+            assert lock.acquire(blocking=False)
+            sleep(0.1)
+            lock.release()
+
+        mocked_fetch_git = mocker.patch.object(
+            Dependency, "fetch_git", side_effect=fetch_git
+        )
+
+        fetched_dependencies = list(
+            fetch_all([git_dependency, git_dependency_no_hash], max_workers=2)
+        )
+
+        assert fetched_dependencies == [git_dependency, git_dependency_no_hash]
+        assert mocked_fetch_git.call_count == 2
+
+    def test_fetch_all_empty(self):
+        """Fetch no dependencies."""
+        assert list(fetch_all([])) == []
+
+    def test_fetch_all_error(self, git_dependency, zip_dependency, mocker):
+        """Error when fetching one dependency among several."""
+        mocker.patch.object(Dependency, "fetch_git")
+        mocker.patch.object(
+            Dependency, "fetch_archive", side_effect=ArchiveDownloadError("error")
+        )
+
+        with pytest.raises(ArchiveDownloadError, match=r"error"):
+            list(fetch_all([git_dependency, zip_dependency]))
+
+        assert git_dependency.fetched
+        assert not zip_dependency.fetched
+
+    def test_fetch_all_errors(self, git_dependency, zip_dependency, mocker):
+        """Errors when fetching several dependencies."""
+        mocker.patch.object(
+            Dependency, "fetch_git", side_effect=GitRepoFetchError("git error")
+        )
+        mocker.patch.object(
+            Dependency, "fetch_archive", side_effect=ArchiveDownloadError("zip error")
+        )
+
+        with pytest.raises(FetchError) as error:
+            list(fetch_all([git_dependency, zip_dependency]))
+
+        assert "git error" in str(error.value)
+        assert "zip error" in str(error.value)
+
+
+class TestBuildAll:
+    def test_build_all(self, git_dependency, zip_dependency, mocker):
+        """Build several dependencies concurrently."""
+        mocker.patch("dependencmake.dependency.CPU_CORES", 4)
+        # each build waits for the other one, so they must run concurrently
+        barrier = Barrier(2, timeout=5)
+        mocked_build = mocker.patch.object(
+            Dependency,
+            "build",
+            autospec=True,
+            side_effect=lambda *_, **__: barrier.wait(),
+        )
+
+        built_dependencies = list(
+            build_all([git_dependency, zip_dependency], Path("install"), ["-DARG=ON"])
+        )
+
+        assert len(built_dependencies) == 2
+        assert git_dependency in built_dependencies
+        assert zip_dependency in built_dependencies
+        assert git_dependency.built
+        assert zip_dependency.built
+        mocked_build.assert_has_calls(
+            [
+                call(git_dependency, Path("install"), ["-DARG=ON"], jobs=4),
+                call(zip_dependency, Path("install"), ["-DARG=ON"], jobs=4),
+            ],
+            any_order=True,
+        )
+
+    def test_build_all_empty(self):
+        """Build no dependencies."""
+        assert list(build_all([], Path("install"))) == []
+
+    def test_build_all_subdependencies(self, zip_dependency, mocker):
+        """Build subdependencies before their parent."""
+        mocker.patch("dependencmake.dependency.CPU_CORES", 4)
+        subdependency = Dependency(
+            name="My subdep",
+            url="http://example.com/subdependency.zip",
+            parent=zip_dependency,
+        )
+        built_names = []
+        mocker.patch.object(
+            Dependency,
+            "build",
+            autospec=True,
+            side_effect=lambda self, *_, **__: built_names.append(self.name),
+        )
+
+        list(build_all([subdependency, zip_dependency], Path("install")))
+
+        assert built_names == ["My subdep", "My zip dep"]
+
+    def test_build_all_share_free_jobs(self, git_dependency, zip_dependency, mocker):
+        """Give to a starting build the jobs left free by running builds."""
+        mocker.patch("dependencmake.dependency.CPU_CORES", 4)
+        subdependency = Dependency(
+            name="My subdep",
+            url="http://example.com/subdependency.zip",
+            parent=zip_dependency,
+        )
+        # the Git dependency build runs until the zip dependency build starts
+        event = Event()
+
+        def build(self, *_, **__):
+            if self is git_dependency:
+                assert event.wait(timeout=5)
+
+            if self is zip_dependency:
+                event.set()
+
+        mocked_build = mocker.patch.object(
+            Dependency, "build", autospec=True, side_effect=build
+        )
+
+        list(
+            build_all([git_dependency, subdependency, zip_dependency], Path("install"))
+        )
+
+        mocked_build.assert_has_calls(
+            [
+                call(git_dependency, Path("install"), [], jobs=4),
+                call(subdependency, Path("install"), [], jobs=4),
+                call(zip_dependency, Path("install"), [], jobs=5),
+            ],
+            any_order=True,
+        )
+
+    @pytest.mark.parametrize("rebuilt", [True, False], ids=["rebuilt", "skipped"])
+    def test_build_all_subdependency_rebuilt(
+        self, zip_dependency, mocker, fs_mocks, rebuilt
+    ):
+        """Do not reuse the build of a parent of a rebuilt subdependency."""
+        subdependency = Dependency(
+            name="My subdep",
+            url="http://example.com/subdependency.zip",
+            parent=zip_dependency,
+        )
+        parent_stamp_removed = []
+        mocker.patch.object(
+            Dependency,
+            "build",
+            autospec=True,
+            side_effect=lambda self, *_, **__: (
+                parent_stamp_removed.append(fs_mocks.remove_p.called) or rebuilt
+            ),
+        )
+
+        list(build_all([subdependency, zip_dependency], Path("install")))
+
+        # the stamp is removed between the two builds
+        assert parent_stamp_removed == [False, rebuilt]
+        if rebuilt:
+            fs_mocks.remove_p.assert_called_once_with(
+                CACHE_BUILD / ZIP_DEP_DIRECTORY_NAME / ".dependencmake_build"
+            )
+
+    def test_build_all_same_directory(self, zip_dependency, mocker):
+        """Build once dependencies sharing the same directory."""
+        other_zip_dependency = Dependency(
+            name="My zip dep", url="http://example.com/dependency.zip"
+        )
+        mocked_build = mocker.patch.object(Dependency, "build", autospec=True)
+
+        built_dependencies = list(
+            build_all([zip_dependency, other_zip_dependency], Path("install"))
+        )
+
+        assert len(built_dependencies) == 2
+        assert other_zip_dependency.built
+        mocked_build.assert_called_once()
+
+    def test_build_all_error(self, zip_dependency, mocker):
+        """Error when building a subdependency."""
+        mocker.patch("dependencmake.dependency.CPU_CORES", 4)
+        subdependency = Dependency(
+            name="My subdep",
+            url="http://example.com/subdependency.zip",
+            parent=zip_dependency,
+        )
+        mocked_build = mocker.patch.object(
+            Dependency, "build", autospec=True, side_effect=BuildError("error")
+        )
+
+        with pytest.raises(BuildError, match=r"error"):
+            list(build_all([subdependency, zip_dependency], Path("install")))
+
+        mocked_build.assert_called_once_with(subdependency, Path("install"), [], jobs=9)
+
+    def test_build_all_errors(self, git_dependency, zip_dependency, mocker):
+        """Errors when building several dependencies."""
+        mocker.patch("dependencmake.dependency.CPU_CORES", 4)
+
+        def build(self, *args, **kwargs):
+            raise BuildError(f"{self.name} error")
+
+        mocker.patch.object(Dependency, "build", autospec=True, side_effect=build)
+
+        with pytest.raises(BuildError) as error:
+            list(build_all([git_dependency, zip_dependency], Path("install")))
+
+        assert "My Git dep error" in str(error.value)
+        assert "My zip dep error" in str(error.value)
+
+    def test_build_all_circular(self, mocker):
+        """Error when building dependencies requiring each other."""
+        dep_a = Dependency(name="A", url="http://example.com/a.zip")
+        dep_b = Dependency(name="B", url="http://example.com/b.zip", parent=dep_a)
+        dep_a_b = Dependency(name="A", url="http://example.com/a.zip", parent=dep_b)
+        mocked_build = mocker.patch.object(Dependency, "build", autospec=True)
+
+        with pytest.raises(
+            CircularDependencyError,
+            match=r"Circular dependency detected between: A, B",
+        ):
+            list(build_all([dep_a_b, dep_b, dep_a], Path("install")))
+
+        mocked_build.assert_not_called()
+
+
+class TestInstallAll:
+    def test_install_all(self, git_dependency, zip_dependency, mocker):
+        """Install several dependencies concurrently."""
+        mocker.patch("dependencmake.dependency.CPU_CORES", 4)
+        # each install waits for the other one, so they must run concurrently
+        barrier = Barrier(2, timeout=5)
+        mocked_install = mocker.patch.object(
+            Dependency, "install", autospec=True, side_effect=lambda _: barrier.wait()
+        )
+
+        installed_dependencies = list(install_all([git_dependency, zip_dependency]))
+
+        assert len(installed_dependencies) == 2
+        assert git_dependency.installed
+        assert zip_dependency.installed
+        mocked_install.assert_has_calls(
+            [call(git_dependency), call(zip_dependency)], any_order=True
+        )
+
+    def test_install_all_subdependencies(self, zip_dependency, mocker):
+        """Install subdependencies before their parent."""
+        mocker.patch("dependencmake.dependency.CPU_CORES", 4)
+        subdependency = Dependency(
+            name="My subdep",
+            url="http://example.com/subdependency.zip",
+            parent=zip_dependency,
+        )
+        installed_names = []
+        mocker.patch.object(
+            Dependency,
+            "install",
+            autospec=True,
+            side_effect=lambda self: installed_names.append(self.name),
+        )
+
+        list(install_all([subdependency, zip_dependency]))
+
+        assert installed_names == ["My subdep", "My zip dep"]
+
+    def test_install_all_same_directory(self, zip_dependency, mocker):
+        """Install once dependencies sharing the same directory."""
+        other_zip_dependency = Dependency(
+            name="My zip dep", url="http://example.com/dependency.zip"
+        )
+        mocked_install = mocker.patch.object(Dependency, "install", autospec=True)
+
+        installed_dependencies = list(
+            install_all([zip_dependency, other_zip_dependency])
+        )
+
+        assert len(installed_dependencies) == 2
+        assert other_zip_dependency.installed
+        mocked_install.assert_called_once()
+
+    def test_install_all_error(self, zip_dependency, mocker):
+        """Error when installing a subdependency."""
+        subdependency = Dependency(
+            name="My subdep",
+            url="http://example.com/subdependency.zip",
+            parent=zip_dependency,
+        )
+        mocked_install = mocker.patch.object(
+            Dependency, "install", autospec=True, side_effect=InstallError("error")
+        )
+
+        with pytest.raises(InstallError, match=r"error"):
+            list(install_all([subdependency, zip_dependency]))
+
+        mocked_install.assert_called_once_with(subdependency)
+
+    def test_install_all_errors(self, git_dependency, zip_dependency, mocker):
+        """Errors when installing several dependencies."""
+
+        def install(self):
+            raise InstallError(f"{self.name} error")
+
+        mocker.patch.object(Dependency, "install", autospec=True, side_effect=install)
+
+        with pytest.raises(InstallError) as error:
+            list(install_all([git_dependency, zip_dependency]))
+
+        assert "My Git dep error" in str(error.value)
+        assert "My zip dep error" in str(error.value)
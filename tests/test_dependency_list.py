@@ -1,13 +1,14 @@
-from io import StringIO
-from unittest.mock import call
+from unittest.mock import ANY
 
 import pytest
 from packaging import version
 from path import Path
 
+from dependencmake.config import ConfigNotFoundError
 from dependencmake.dependency import Dependency
 from dependencmake.dependency_list import DependencyList, DiamondDependencyError
-from dependencmake.filesystem import CACHE, CACHE_BUILD, CACHE_FETCH, CACHE_INSTALL
+from dependencmake.filesystem import CACHE_BUILD, CACHE_FETCH, CACHE_INSTALL
+from dependencmake.graph import CircularDependencyError
 
 
 @pytest.fixture
@@ -65,35 +66,100 @@ class TestDependencyList:
         mocked_get_config.assert_called_with(Path("path"))
         mocked_check_config.assert_called_with(config)
 
-    def test_describe(self, dependency_list, mocker):
+    def test_create_subdependencies_circular(self, dependency_list, mocker):
+        """Error when a dependency depends on itself through a subdependency."""
+        dep1 = dependency_list.dependencies[0]
+        dep3 = Dependency(name="My dep 3", url="http://example.com/dep3")
+        configs = {
+            CACHE_FETCH
+            / dep1.directory_name: {
+                "dependencies": [{"name": dep3.name, "url": dep3.url}]
+            },
+            CACHE_FETCH
+            / dep3.directory_name: {
+                "dependencies": [{"name": dep1.name, "url": dep1.url}]
+            },
+        }
+
+        def get_config(path):
+            if path not in configs:
+                raise ConfigNotFoundError("not found")
+
+            return configs[path]
+
+        mocker.patch("dependencmake.dependency_list.get_config", side_effect=get_config)
+
+        with pytest.raises(
+            CircularDependencyError,
+            match=r"My dep 1 depends on itself through My dep 3",
+        ):
+            dependency_list.create_subdependencies()
+
+    def test_describe(self, dependency_list, mocker, output):
         """Describe dependencies in list."""
         mocked_refresh = mocker.patch.object(Dependency, "refresh")
         mocked_describe = mocker.patch.object(Dependency, "describe")
 
-        output = StringIO()
         dependency_list.describe(output)
 
         mocked_refresh.assert_called_with()
         mocked_describe.assert_called_with(output)
 
-    def test_fetch(self, dependency_list, mocker):
+    def test_fetch(self, dependency_list, mocker, output):
         """Fetch dependencies in list."""
-        mocked_mkdir_p = mocker.patch.object(Path, "mkdir_p", autospec=True)
+        mocked_makedirs_p = mocker.patch.object(Path, "makedirs_p", autospec=True)
         mocked_fetch = mocker.patch.object(Dependency, "fetch")
         mocked_set_cmake_project_data = mocker.patch.object(
             Dependency, "set_cmake_project_data"
         )
 
-        output = StringIO()
         dependency_list.fetch(output)
 
-        mocked_mkdir_p.assert_has_calls([call(CACHE), call(CACHE_FETCH)])
+        mocked_makedirs_p.assert_called_once_with(CACHE_FETCH)
         mocked_fetch.assert_called_with()
         mocked_set_cmake_project_data.assert_called_with()
 
-    def test_build(self, dependency_list, mocker):
+    def test_fetch_subdependencies(self, dependency_list, mocker, output):
+        """Fetch subdependencies by batches of siblings."""
+        mocker.patch.object(Path, "makedirs_p", autospec=True)
+        mocked_fetch_all = mocker.patch(
+            "dependencmake.dependency_list.fetch_all", side_effect=iter
+        )
+        mocker.patch.object(Dependency, "set_cmake_project_data")
+        dep1 = dependency_list.dependencies[0]
+        configs = {
+            CACHE_FETCH
+            / dep1.directory_name: {
+                "dependencies": [
+                    {"name": "My dep 3", "url": "http://example.com/dep3"},
+                    {"name": "My dep 4", "url": "http://example.com/dep4"},
+                ]
+            },
+        }
+
+        def get_config(path):
+            if path not in configs:
+                raise ConfigNotFoundError("not found")
+
+            return configs[path]
+
+        mocker.patch("dependencmake.dependency_list.get_config", side_effect=get_config)
+
+        dependency_list.fetch(output)
+
+        assert mocked_fetch_all.call_count == 2
+        batch = mocked_fetch_all.call_args[0][0]
+        assert [dependency.name for dependency in batch] == ["My dep 3", "My dep 4"]
+        assert [dependency.name for dependency in dependency_list.dependencies] == [
+            "My dep 3",
+            "My dep 4",
+            "My dep 1",
+            "My dep 2",
+        ]
+
+    def test_build(self, dependency_list, mocker, output):
         """Build dependencies in list."""
-        mocked_mkdir_p = mocker.patch.object(Path, "mkdir_p", autospec=True)
+        mocked_makedirs_p = mocker.patch.object(Path, "makedirs_p", autospec=True)
         mocked_check_cmake_exists = mocker.patch(
             "dependencmake.dependency_list.check_cmake_exists"
         )
@@ -103,14 +169,13 @@ class TestDependencyList:
         )
         mocked_get_install_path.return_value = Path("install")
 
-        output = StringIO()
         dependency_list.build(["-DCMAKE_ARG=ON"], output)
 
-        mocked_mkdir_p.assert_called_with(CACHE_BUILD)
+        mocked_makedirs_p.assert_called_once_with(CACHE_BUILD)
         mocked_check_cmake_exists.assert_called_with()
-        mocked_build.assert_called_with(Path("install"), ["-DCMAKE_ARG=ON"])
+        mocked_build.assert_called_with(Path("install"), ["-DCMAKE_ARG=ON"], jobs=ANY)
 
-    def test_install(self, dependency_list, mocker):
+    def test_install(self, dependency_list, mocker, output):
         """Install dependencies in list."""
         mocked_makedirs_p = mocker.patch.object(Path, "makedirs_p", autospec=True)
         mocked_check_cmake_exists = mocker.patch(
@@ -118,42 +183,62 @@ class TestDependencyList:
         )
         mocked_install = mocker.patch.object(Dependency, "install")
 
-        output = StringIO()
         dependency_list.install(output)
 
         mocked_makedirs_p.assert_called_with(CACHE_INSTALL)
         mocked_check_cmake_exists.assert_called_with()
         mocked_install.assert_called_with()
 
-    def test_check(self, dependency_list_data):
+    def test_check(self, dependency_list_data, output):
         """Check dependencies in list."""
-        output = StringIO()
         dependency_list_data.check(output)
 
-    def test_check_diamond_dependencies_same_version(self, dependency_list_data):
+    def test_check_diamond_dependencies_same_version(
+        self, dependency_list_data, output
+    ):
         """Do not detect diamond dependency with same version during check."""
         dependency_list_data.dependencies[1].cmake_project_name = "Dep1"
         dependency_list_data.dependencies[1].cmake_project_version = version.parse(
             "1.2.0"
         )
 
-        output = StringIO()
         dependency_list_data.check(output)
 
-    def test_check_diamond_dependencies_same_url(self, dependency_list_data):
+    def test_check_diamond_dependencies_same_url(self, dependency_list_data, output):
         """Do not detect diamond dependency with same url during check."""
         dependency_list_data.dependencies[1].cmake_project_name = "Dep1"
         dependency_list_data.dependencies[1].url = "http://example.com/dep1"
 
-        output = StringIO()
         dependency_list_data.check(output)
 
-    def test_check_diamond_dependencies_error(self, dependency_list_data):
+    def test_check_diamond_dependencies_error(self, dependency_list_data, output):
         """Detect diamond dependency during check."""
         dependency_list_data.dependencies[1].cmake_project_name = "Dep1"
 
         with pytest.raises(DiamondDependencyError):
-            output = StringIO()
+            dependency_list_data.check(output)
+
+    def test_check_diamond_dependencies_error_among_several(
+        self, dependency_list_data, output
+    ):
+        """Detect diamond dependency among several compatible ones during check."""
+        dependency_list_data.dependencies[1].cmake_project_name = "Dep1"
+        dependency_list_data.dependencies[1].cmake_project_version = version.parse(
+            "1.2.0"
+        )
+        dependency_list_data.dependencies.append(
+            Dependency(
+                name="My dep 1",
+                url="http://example.com/dep1",
+                cmake_project_name="Dep1",
+            )
+        )
+
+        # first and second have the same version, first and third the same URL,
+        # but second and third have nothing in common
+        with pytest.raises(
+            DiamondDependencyError, match=r"URL: http://example.com/dep2"
+        ):
             dependency_list_data.check(output)
 
     def test_get_install_directory_default(self, mocker):
@@ -173,3 +258,33 @@ class TestDependencyList:
         dependency_list = DependencyList(Path("lib"))
 
         assert dependency_list.get_install_path() == Path("lib")
+
+    def test_get_install_directory_cached(self, mocker):
+        """Resolve install directory only once."""
+        mocked_realpath = mocker.patch.object(Path, "realpath", autospec=True)
+        mocked_realpath.side_effect = lambda p: p
+
+        dependency_list = DependencyList(Path("lib"))
+        dependency_list.get_install_path()
+
+        assert dependency_list.get_install_path() == Path("lib")
+        mocked_realpath.assert_called_once_with(Path("lib"))
+
+    def test_get_install_directory_changed(self, mocker):
+        """Resolve install directory again when it is changed."""
+        mocked_realpath = mocker.patch.object(Path, "realpath", autospec=True)
+        mocked_realpath.side_effect = lambda p: p
+
+        dependency_list = DependencyList(Path("lib"))
+        dependency_list.get_install_path()
+        dependency_list.install_path = Path("other_lib")
+
+        assert dependency_list.get_install_path() == Path("other_lib")
+
+    def test_install_directory_resolved_hidden(self):
+        """Do not expose the resolved install directory."""
+        dependency_list = DependencyList(Path("lib"))
+
+        assert "resolved" not in repr(dependency_list)
+        with pytest.raises(TypeError):
+            DependencyList(Path("lib"), [], Path("lib"))
@@ -1,56 +1,35 @@
-try:
-    from importlib.resources import path
-
-except ImportError:
-    from importlib_resources import path  # type: ignore
-
 import pytest
-from path import Path
 
 from dependencmake.dependency_list import DependencyList
+from tests._helpers import link_or_copy
 
 
 @pytest.fixture
-def temp_directory(tmp_path):
-    return Path(tmp_path)
-
-
-@pytest.fixture
-def subdependencies_temp_directory(temp_directory):
-    with path("tests.resources.subdependencies", "dependencmake.yaml") as config:
-        Path(config).copy(temp_directory)
+def subdependencies_temp_directory(temp_directory, resources_directory):
+    resources_subdirectory = resources_directory / "subdependencies"
+    link_or_copy(resources_subdirectory / "dependencmake.yaml", temp_directory)
 
     fetch_directory = (temp_directory / "dependencmake" / "fetch").makedirs_p()
-    (fetch_directory / "dep11_1d264692d45516dcae4a8f07a847d742").mkdir_p()
-    (fetch_directory / "dep12_fe8ba562a3f2c89af885e5036f465d4b").mkdir_p()
-    dep1 = (fetch_directory / "dep1_36e47005e2edb6e84fdb0e2e411bff5a").mkdir_p()
-    (fetch_directory / "dep21_d1efc308c741bb9421611de57b61aec2").mkdir_p()
-    dep2 = (fetch_directory / "dep2_4b35bd592421ea9170dfb690d7550744").mkdir_p()
-
-    resource = "tests.resources.subdependencies.dependencmake.fetch"
-
-    with path(
-        f"{resource}.dep1_36e47005e2edb6e84fdb0e2e411bff5a",
-        "dependencmake.yaml",
-    ) as config:
-        Path(config).copy(dep1)
+    (fetch_directory / "dep11_01592d0a7e6a4c259dc5cb5cffac00b4").mkdir_p()
+    (fetch_directory / "dep12_b2ef421bdcf66dfe332706fd2c643430").mkdir_p()
+    dep1 = (fetch_directory / "dep1_40b3c146841b3e3d74eda60cdcd6e8e7").mkdir_p()
+    (fetch_directory / "dep21_715ab093531e5ad0ff247f82a9fa64a3").mkdir_p()
+    dep2 = (fetch_directory / "dep2_13d19ce8be8d34b3136fdc800b78db09").mkdir_p()
 
-    with path(
-        f"{resource}.dep2_4b35bd592421ea9170dfb690d7550744",
-        "dependencmake.yaml",
-    ) as config:
-        Path(config).copy(dep2)
+    resources_fetch_directory = resources_subdirectory / "dependencmake" / "fetch"
+    link_or_copy(resources_fetch_directory / dep1.name / "dependencmake.yaml", dep1)
+    link_or_copy(resources_fetch_directory / dep2.name / "dependencmake.yaml", dep2)
 
     return temp_directory
 
 
 class TestDependencyList:
-    def test_create_subdependencies(self, subdependencies_temp_directory):
+    def test_create_subdependencies(self, monkeypatch, subdependencies_temp_directory):
         """Create supdependencies."""
-        with subdependencies_temp_directory:
-            dependency_list = DependencyList()
-            dependency_list.create_dependencies(subdependencies_temp_directory)
-            dependency_list.create_subdependencies()
+        monkeypatch.chdir(subdependencies_temp_directory)
+        dependency_list = DependencyList()
+        dependency_list.create_dependencies(subdependencies_temp_directory)
+        dependency_list.create_subdependencies()
 
         assert len(dependency_list.dependencies) == 5
         assert dependency_list.dependencies[0].name == "Dep11"
@@ -59,17 +38,19 @@ class TestDependencyList:
         assert dependency_list.dependencies[3].name == "Dep21"
         assert dependency_list.dependencies[4].name == "Dep2"
 
-    def test_fetch_subdependencies(self, mocker, subdependencies_temp_directory):
+    def test_fetch_subdependencies(
+        self, monkeypatch, mocker, subdependencies_temp_directory
+    ):
         """Fetch supdependencies."""
-        mocker.patch("dependencmake.dependency.urlretrieve")
-        mocker.patch("dependencmake.dependency.unpack_archive")
-        mocked_get_project_data = mocker.patch(
-            "dependencmake.dependency.get_project_data"
+        mocks = mocker.patch.multiple(
+            "dependencmake.dependency",
+            download_and_extract=mocker.DEFAULT,
+            get_project_data=mocker.DEFAULT,
         )
-        mocked_get_project_data.return_value = {"name": "Dep", "version": "1.0.0"}
+        mocks["get_project_data"].return_value = {"name": "Dep", "version": "1.0.0"}
 
-        with subdependencies_temp_directory:
-            dependency_list = DependencyList()
-            dependency_list.create_dependencies(subdependencies_temp_directory)
-            dependency_list.create_subdependencies()
-            dependency_list.fetch()
+        monkeypatch.chdir(subdependencies_temp_directory)
+        dependency_list = DependencyList()
+        dependency_list.create_dependencies(subdependencies_temp_directory)
+        dependency_list.create_subdependencies()
+        dependency_list.fetch()
@@ -0,0 +1,80 @@
+import pytest
+
+from dependencmake.dependency import Dependency
+from dependencmake.graph import (
+    CircularDependencyError,
+    compute_order,
+    get_requirements,
+    group_by_directory,
+)
+
+
+@pytest.fixture
+def diamond_dependencies():
+    """Dependencies where A depends on B and C, which both depend on D."""
+    dep_a = Dependency(name="A", url="http://example.com/a.zip")
+    dep_b = Dependency(name="B", url="http://example.com/b.zip", parent=dep_a)
+    dep_c = Dependency(name="C", url="http://example.com/c.zip", parent=dep_a)
+    dep_d_b = Dependency(name="D", url="http://example.com/d.zip", parent=dep_b)
+    dep_d_c = Dependency(name="D", url="http://example.com/d.zip", parent=dep_c)
+
+    # subdependencies are listed before their parent
+    return [dep_d_b, dep_b, dep_d_c, dep_c, dep_a]
+
+
+class TestGroupByDirectory:
+    def test_group_by_directory(self, diamond_dependencies):
+        """Group dependencies sharing the same directory."""
+        dep_d_b, dep_b, dep_d_c, dep_c, dep_a = diamond_dependencies
+
+        groups = group_by_directory(diamond_dependencies)
+
+        assert list(groups.values()) == [[dep_d_b, dep_d_c], [dep_b], [dep_c], [dep_a]]
+
+
+class TestGetRequirements:
+    def test_get_requirements(self, diamond_dependencies):
+        """Get direct subdependencies of each dependency."""
+        dep_d_b, dep_b, _, dep_c, dep_a = diamond_dependencies
+
+        requirements = get_requirements(diamond_dependencies)
+
+        assert requirements == {
+            dep_d_b.directory_name: set(),
+            dep_b.directory_name: {dep_d_b.directory_name},
+            dep_c.directory_name: {dep_d_b.directory_name},
+            dep_a.directory_name: {dep_b.directory_name, dep_c.directory_name},
+        }
+
+    def test_get_requirements_parent_missing(self):
+        """Ignore parents not in the list."""
+        dep_a = Dependency(name="A", url="http://example.com/a.zip")
+        dep_b = Dependency(name="B", url="http://example.com/b.zip", parent=dep_a)
+
+        assert get_requirements([dep_b]) == {dep_b.directory_name: set()}
+
+
+class TestComputeOrder:
+    def test_compute_order_diamond(self, diamond_dependencies):
+        """Sort a diamond of dependencies."""
+        dep_d_b, dep_b, _, dep_c, dep_a = diamond_dependencies
+
+        order = compute_order(diamond_dependencies)
+
+        assert order == [[dep_d_b], [dep_b, dep_c], [dep_a]]
+
+    def test_compute_order_empty(self):
+        """Sort no dependencies."""
+        assert compute_order([]) == []
+
+    def test_compute_order_circular(self):
+        """Error when sorting dependencies requiring each other."""
+        dep_a = Dependency(name="A", url="http://example.com/a.zip")
+        dep_b = Dependency(name="B", url="http://example.com/b.zip", parent=dep_a)
+        dep_a_b = Dependency(name="A", url="http://example.com/a.zip", parent=dep_b)
+
+        with pytest.raises(
+            CircularDependencyError,
+            match=r"Circular dependency detected between: A, B",
+        ):
+            compute_order([dep_a_b, dep_b, dep_a])
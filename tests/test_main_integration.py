@@ -1,190 +1,122 @@
-from argparse import Namespace
-from io import StringIO
-
-try:
-    from importlib.resources import path
-
-except ImportError:
-    from importlib_resources import path  # type: ignore
+import sys
+from unittest.mock import MagicMock
 
 import pytest
 from path import Path
 
 from dependencmake.__main__ import run_build, run_fetch, run_install, run_list
 from dependencmake.filesystem import CACHE_INSTALL
+from tests._helpers import link_or_copy, make_run_args
+
+
+@pytest.fixture
+def mocked_backends(monkeypatch):
+    """Mock Git, archive downloads and CMake runs."""
+    monkeypatch.setattr("git.Repo", MagicMock())
+    monkeypatch.setattr("dependencmake.dependency.download_and_extract", MagicMock())
+    monkeypatch.setattr("dependencmake.cmake.run", MagicMock())
+    monkeypatch.setattr(
+        "dependencmake.dependency.check_cmake_lists_file_exists", lambda path: None
+    )
 
 
 @pytest.fixture
-def temp_directory(tmp_path):
-    return Path(tmp_path)
+def project_data_mock(monkeypatch):
+    """Mock project data of the dependencies of the test config file."""
+    mocked_get_project_data = MagicMock(
+        side_effect=[
+            {"name": "Dep1", "version": "1.0.0"},
+            {"name": "Dep2", "version": "2.0.0"},
+        ]
+    )
+    monkeypatch.setattr(
+        "dependencmake.dependency.get_project_data", mocked_get_project_data
+    )
+
+    return mocked_get_project_data
 
 
 class TestRunList:
-    def test_run(self, temp_directory):
+    def test_run(self, monkeypatch, temp_directory, config_file, null_output):
         """List dependencies."""
         # copy test files
-        with path("tests.resources", "dependencmake.yaml") as config:
-            Path(config).copy(temp_directory)
+        link_or_copy(config_file, temp_directory)
 
         # run test
-        with temp_directory:
-            args = Namespace(path=temp_directory)
-            output = StringIO()
-            run_list(args, output)
+        monkeypatch.chdir(temp_directory)
+        args = make_run_args(temp_directory)
+        run_list(args, null_output)
 
 
 class TestRunFetch:
-    def test_run(self, mocker, temp_directory):
+    def test_run(
+        self,
+        monkeypatch,
+        mocked_backends,
+        project_data_mock,
+        temp_directory,
+        config_file,
+        null_output,
+    ):
         """Fetch dependencies."""
-        mocker.patch("dependencmake.dependency.Repo")
-        mocker.patch("dependencmake.dependency.urlretrieve")
-        mocker.patch("dependencmake.dependency.unpack_archive")
-        mocked_get_project_data = mocker.patch(
-            "dependencmake.dependency.get_project_data"
-        )
-        mocked_get_project_data.side_effect = [
-            {"name": "Dep1", "version": "1.0.0"},
-            {"name": "Dep2", "version": "2.0.0"},
-        ]
-
         # copy test files
-        with path("tests.resources", "dependencmake.yaml") as config:
-            Path(config).copy(temp_directory)
+        link_or_copy(config_file, temp_directory)
 
         # run test
-        with temp_directory:
-            args = Namespace(path=temp_directory, force=False)
-            output = StringIO()
-            run_fetch(args, output)
+        monkeypatch.chdir(temp_directory)
+        args = make_run_args(temp_directory)
+        run_fetch(args, null_output)
 
 
 class TestRunBuild:
-    def test_run(self, mocker, temp_directory):
-        """Build dependencies."""
-        mocker.patch("dependencmake.dependency.Repo")
-        mocker.patch("dependencmake.dependency.urlretrieve")
-        mocker.patch("dependencmake.dependency.unpack_archive")
-        mocker.patch("dependencmake.cmake.run")
-        mocker.patch(
-            "dependencmake.dependency.check_cmake_lists_file_exists", autospec=True
-        )
-        mocked_get_project_data = mocker.patch(
-            "dependencmake.dependency.get_project_data"
-        )
-        mocked_get_project_data.side_effect = [
-            {"name": "Dep1", "version": "1.0.0"},
-            {"name": "Dep2", "version": "2.0.0"},
-        ]
-
+    @pytest.mark.parametrize("install_path", [None, Path("lib")])
+    def test_run(
+        self,
+        monkeypatch,
+        mocked_backends,
+        project_data_mock,
+        temp_directory,
+        config_file,
+        install_path,
+        null_output,
+    ):
+        """Build dependencies, with default or specific install path."""
         # copy test files
-        with path("tests.resources", "dependencmake.yaml") as config:
-            Path(config).copy(temp_directory)
+        link_or_copy(config_file, temp_directory)
 
         # run test
-        with temp_directory:
-            args = Namespace(
-                path=temp_directory, force=False, install_path=None, rest=[]
-            )
-            output = StringIO()
-            run_build(args, output)
-
-    def test_run_install_path(self, mocker, temp_directory):
-        """Build dependencies with specific install path."""
-        mocker.patch("dependencmake.dependency.Repo")
-        mocker.patch("dependencmake.dependency.urlretrieve")
-        mocker.patch("dependencmake.dependency.unpack_archive")
-        mocker.patch("dependencmake.cmake.run")
-        mocker.patch(
-            "dependencmake.dependency.check_cmake_lists_file_exists", autospec=True
-        )
-        mocked_get_project_data = mocker.patch(
-            "dependencmake.dependency.get_project_data"
-        )
-        mocked_get_project_data.side_effect = [
-            {"name": "Dep1", "version": "1.0.0"},
-            {"name": "Dep2", "version": "2.0.0"},
-        ]
-
-        # copy test files
-        with path("tests.resources", "dependencmake.yaml") as config:
-            Path(config).copy(temp_directory)
-
-        # run test
-        with temp_directory:
-            args = Namespace(
-                path=temp_directory, force=False, install_path=Path("lib"), rest=[]
-            )
-            output = StringIO()
-            run_build(args, output)
+        monkeypatch.chdir(temp_directory)
+        args = make_run_args(temp_directory, install_path=install_path)
+        run_build(args, null_output)
 
 
 class TestRunInstall:
-    def test_run(self, mocker, temp_directory):
-        """Install dependencies."""
-        mocker.patch("dependencmake.dependency.Repo")
-        mocker.patch("dependencmake.dependency.urlretrieve")
-        mocker.patch("dependencmake.dependency.unpack_archive")
-        mocker.patch("dependencmake.cmake.run")
-        mocker.patch(
-            "dependencmake.dependency.check_cmake_lists_file_exists", autospec=True
-        )
-        mocked_get_project_data = mocker.patch(
-            "dependencmake.dependency.get_project_data"
-        )
-        mocked_get_project_data.side_effect = [
-            {"name": "Dep1", "version": "1.0.0"},
-            {"name": "Dep2", "version": "2.0.0"},
-        ]
-
+    @pytest.mark.parametrize(
+        "install_path,expected_install_path",
+        [(None, CACHE_INSTALL), (Path("lib"), Path("lib"))],
+    )
+    def test_run(
+        self,
+        monkeypatch,
+        mocked_backends,
+        project_data_mock,
+        temp_directory,
+        config_file,
+        capsys,
+        install_path,
+        expected_install_path,
+    ):
+        """Install dependencies, with default or specific install path."""
         # copy test files
-        with path("tests.resources", "dependencmake.yaml") as config:
-            Path(config).copy(temp_directory)
+        link_or_copy(config_file, temp_directory)
 
         # run test
-        with temp_directory:
-            args = Namespace(
-                path=temp_directory, force=False, install_path=None, rest=[]
-            )
-            output = StringIO()
-            run_install(args, output)
-
-        content = output.getvalue()
-        assert (
-            "You can now call CMake with -DCMAKE_PREFIX_PATH="
-            f"{temp_directory / CACHE_INSTALL}" in content
-        )
+        monkeypatch.chdir(temp_directory)
+        args = make_run_args(temp_directory, install_path=install_path)
+        run_install(args, sys.stdout)
 
-    def test_run_install_path(self, mocker, temp_directory):
-        """Install dependencies with specific install path."""
-        mocker.patch("dependencmake.dependency.Repo")
-        mocker.patch("dependencmake.dependency.urlretrieve")
-        mocker.patch("dependencmake.dependency.unpack_archive")
-        mocker.patch("dependencmake.cmake.run")
-        mocker.patch(
-            "dependencmake.dependency.check_cmake_lists_file_exists", autospec=True
-        )
-        mocked_get_project_data = mocker.patch(
-            "dependencmake.dependency.get_project_data"
-        )
-        mocked_get_project_data.side_effect = [
-            {"name": "Dep1", "version": "1.0.0"},
-            {"name": "Dep2", "version": "2.0.0"},
-        ]
-
-        # copy test files
-        with path("tests.resources", "dependencmake.yaml") as config:
-            Path(config).copy(temp_directory)
-
-        # run test
-        with temp_directory:
-            args = Namespace(
-                path=temp_directory, force=False, install_path=Path("lib"), rest=[]
-            )
-            output = StringIO()
-            run_install(args, output)
-
-        content = output.getvalue()
+        content = capsys.readouterr().out
         assert (
             "You can now call CMake with -DCMAKE_PREFIX_PATH="
-            f"{temp_directory / 'lib'}" in content
+            f"{temp_directory / expected_install_path}" in content
         )